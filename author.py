@@ -1,4 +1,6 @@
 import re
+import weakref
+from collections.abc import MutableSequence
 from dataclasses import dataclass
 from enum import Enum
 
@@ -73,12 +75,102 @@ class AuthorFormatConfig:
         config.parts_order = data.get("parts_order", config._get_default_order())
         return config
 
-@dataclass
+_INTERNED_AUTHORS = weakref.WeakValueDictionary()
+
+def intern_author(last_name="", first_name="", middle_name=""):
+    key = (last_name, first_name, middle_name)
+    author = _INTERNED_AUTHORS.get(key)
+    if author is None:
+        author = Author(last_name, first_name, middle_name)
+        _INTERNED_AUTHORS[key] = author
+    return author
+
+class AuthorList(MutableSequence):
+    # Первые авторы хранятся разобранными, остальные - исходными строками до первого обращения
+    def __init__(self, authors=(), tail=(), parse=None):
+        self._authors = list(authors)
+        self._tail = list(tail)
+        self._parse = parse
+
+    def _materialize(self, count=None):
+        tail = self._tail
+        if not tail:
+            return
+        authors = self._authors
+        parsed = 0
+        while parsed < len(tail) and (count is None or len(authors) < count):
+            author = self._parse(tail[parsed])
+            parsed += 1
+            if author and author.last_name:
+                authors.append(author)
+        del tail[:parsed]
+
+    def __len__(self):
+        self._materialize()
+        return len(self._authors)
+
+    def __bool__(self):
+        self._materialize(1)
+        return bool(self._authors)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            start, stop = index.start, index.stop
+            if stop is not None and stop >= 0 and (start is None or start >= 0):
+                self._materialize(stop)
+            else:
+                self._materialize()
+        elif index >= 0:
+            self._materialize(index + 1)
+        else:
+            self._materialize()
+        return self._authors[index]
+
+    def __iter__(self):
+        i = 0
+        while True:
+            if i >= len(self._authors):
+                if not self._tail:
+                    return
+                self._materialize(i + 1)
+                continue
+            yield self._authors[i]
+            i += 1
+
+    def __setitem__(self, index, value):
+        self._materialize()
+        self._authors[index] = value
+
+    def __delitem__(self, index):
+        self._materialize()
+        del self._authors[index]
+
+    def insert(self, index, value):
+        self._materialize()
+        self._authors.insert(index, value)
+
+    def __eq__(self, other):
+        if isinstance(other, (list, AuthorList)):
+            return list(self) == list(other)
+        return NotImplemented
+
+    __hash__ = None
+
+    def __repr__(self):
+        return repr(list(self))
+
+    def __reduce__(self):
+        return (AuthorList, (self._authors, self._tail, self._parse))
+
+@dataclass(frozen=True)
 class Author:
     last_name: str = ""
     first_name: str = ""
     middle_name: str = ""
 
+    def __reduce__(self):
+        return (intern_author, (self.last_name, self.first_name, self.middle_name))
+
     def format(self, formatter=None):
         if formatter:
             return formatter.format_author(self)
@@ -108,6 +200,14 @@ class Author:
 
     @classmethod
     def parse(cls, author_str):
+        # Как и при разборе списка литературы, одинаковые авторы - один объект
+        author = cls._parse(author_str)
+        if cls is not Author:
+            return author
+        return intern_author(author.last_name, author.first_name, author.middle_name)
+
+    @classmethod
+    def _parse(cls, author_str):
         author_str = author_str.strip()
         if not author_str:
             return cls()
@@ -1,138 +1,140 @@
+import re
+from operator import attrgetter
 from typing import List, Dict
 from author import Author, AuthorFormat, AuthorFormatConfig
 
+_TEMPLATE_PLACEHOLDER_RE = re.compile(r'\{(last|first|middle|fi|mi|f|m|l|initials)\}')
+
 class AuthorFormatter:
     def __init__(self, config=None):
         self.config = config or AuthorFormatConfig.get_preset(AuthorFormat.LAST_FIRST_INITIALS)
-
-    def format_author(self, author):
-        if self.config.format_type == AuthorFormat.CUSTOM and self.config.template:
-            return self._format_custom(author)
-
-        if self.config.format_type == AuthorFormat.LAST_FIRST_INITIALS:
-            return self._format_last_first_initials(author)
-        elif self.config.format_type == AuthorFormat.FIRST_LAST_INITIALS:
-            return self._format_first_last_initials(author)
-        elif self.config.format_type == AuthorFormat.LAST_COMMA_FIRST:
-            return self._format_last_comma_first(author)
-        elif self.config.format_type == AuthorFormat.FIRST_INITIAL_LAST:
-            return self._format_first_initial_last(author)
-        elif self.config.format_type == AuthorFormat.LAST_ONLY:
-            return self._format_last_only(author)
-        else:
-            return self._format_general(author)
-
-    def _format_last_first_initials(self, author):
-        initials = self._get_initials(author)
-        if initials:
-            return f"{author.last_name} {initials}"
-        else:
-            return author.last_name
-
-    def _format_first_last_initials(self, author):
-        initials = self._get_initials(author)
-        if initials:
-            return f"{initials} {author.last_name}"
+        self._compiled_key = None
+        self._compiled = None
+
+    def _config_key(self):
+        config = self.config
+        return (config.format_type, config.template, config.initials_dot,
+                config.initials_space, tuple(config.parts_order or ()))
+
+    def _compile_author(self):
+        # Конфигурация изменяемая, поэтому функция пересобирается при изменении ключа
+        key = self._config_key()
+        if key != self._compiled_key:
+            self._compiled_key = key
+            self._compiled = self._build_format()
+        return self._compiled
+
+    def _build_format(self):
+        format_type = self.config.format_type
+        name_initials = self._name_initials_memo()
+
+        if format_type == AuthorFormat.CUSTOM and self.config.template:
+            return self._compile_custom(name_initials)
+
+        if format_type == AuthorFormat.LAST_FIRST_INITIALS:
+            def format_author(author):
+                initials = name_initials(author.first_name) + name_initials(author.middle_name)
+                return f"{author.last_name} {initials}" if initials else author.last_name
+        elif format_type == AuthorFormat.FIRST_LAST_INITIALS:
+            def format_author(author):
+                initials = name_initials(author.first_name) + name_initials(author.middle_name)
+                return f"{initials} {author.last_name}" if initials else author.last_name
+        elif format_type == AuthorFormat.LAST_COMMA_FIRST:
+            def format_author(author):
+                initials = name_initials(author.first_name) + name_initials(author.middle_name)
+                return f"{author.last_name}, {initials}" if initials else author.last_name
+        elif format_type == AuthorFormat.FIRST_INITIAL_LAST:
+            format_initial = self._format_initial
+
+            def format_author(author):
+                if author.first_name:
+                    return f"{format_initial(author.first_name[0])} {author.last_name}"
+                return author.last_name
+        elif format_type == AuthorFormat.LAST_ONLY:
+            def format_author(author):
+                return author.last_name
         else:
-            return author.last_name
-
-    def _format_last_comma_first(self, author):
-        initials = self._get_initials(author)
-        if initials:
-            return f"{author.last_name}, {initials}"
-        else:
-            return author.last_name
-
-    def _format_first_initial_last(self, author):
-        if author.first_name:
-            return f"{self._format_initial(author.first_name[0])} {author.last_name}"
-        else:
-            return author.last_name
+            format_author = self._compile_general(name_initials)
+        return format_author
+
+    def _name_initials_memo(self):
+        # Имена интернированных авторов повторяются, инициалы считаются один раз на имя
+        memo = {"": ""}
+        format_initial = self._format_initial
+
+        def name_initials(name):
+            initials = memo.get(name)
+            if initials is None:
+                if '-' in name:
+                    initials = '-'.join(format_initial(part[0]) for part in name.split('-') if part)
+                else:
+                    initials = format_initial(name[0])
+                memo[name] = initials
+            return initials
 
-    def _format_last_only(self, author):
-        return author.last_name
+        return name_initials
 
-    def _format_general(self, author):
-        parts = []
+    def format_author(self, author):
+        return self._compile_author()(author)
+
+    def compile(self):
+        # Снимок текущей конфигурации: функция форматирования списка авторов без проверок
+        format_author = self._compile_author()
+        config = self.config
+        include_et_al, et_al_limit, and_word = config.include_et_al, config.et_al_limit, config.and_word
+        join_authors = self._join_authors
+
+        def format_authors(authors):
+            if include_et_al and et_al_limit >= 0:
+                # Форматируются только авторы, которые попадут в вывод
+                authors = authors[:max(et_al_limit, 1) + 1]
+            if not authors:
+                return ""
+            if len(authors) == 1:
+                return format_author(authors[0])
+            if include_et_al and len(authors) > et_al_limit:
+                return join_authors([format_author(author) for author in authors[:et_al_limit]]) + and_word + "др."
+            return join_authors([format_author(author) for author in authors])
+
+        return format_authors
+
+    def _compile_general(self, name_initials):
+        getters = []
         for part_type in self.config.parts_order:
-            part = self._get_author_part(author, part_type)
-            if part:
-                parts.append(part)
-
-        result = ""
-        for i, part in enumerate(parts):
-            if part in [",", " "]:
-                result += part
-            else:
-                if i > 0 and parts[i-1] not in [",", " "]:
-                    result += " "
-                result += part
-
-        return result.strip()
-
-    def _get_initials(self, author):
-        initials = ""
-
-        if author.first_name:
-            if '-' in author.first_name:
-                parts = author.first_name.split('-')
-                formatted_parts = []
-                for part in parts:
-                    if part:
-                        formatted_parts.append(self._format_initial(part[0]))
-                initials += '-'.join(formatted_parts)
-            else:
-                initials += self._format_initial(author.first_name[0])
-
-        if author.middle_name:
-            if '-' in author.middle_name:
-                parts = author.middle_name.split('-')
-                formatted_parts = []
-                for part in parts:
-                    if part:
-                        formatted_parts.append(self._format_initial(part[0]))
-                initials += '-'.join(formatted_parts)
-            else:
-                initials += self._format_initial(author.middle_name[0])
-
-        return initials
-
-    def _get_author_part(self, author, part_type):
-        if part_type == "last_name":
-            return author.last_name
-        elif part_type == "first_name":
-            return author.first_name
-        elif part_type == "middle_name":
-            return author.middle_name
-        elif part_type == "first_initial":
-            if author.first_name:
-                if '-' in author.first_name:
-                    parts = author.first_name.split('-')
-                    formatted_parts = []
-                    for part in parts:
-                        if part:
-                            formatted_parts.append(self._format_initial(part[0]))
-                    return '-'.join(formatted_parts)
-                else:
-                    return self._format_initial(author.first_name[0])
-        elif part_type == "middle_initial":
-            if author.middle_name:
-                if '-' in author.middle_name:
-                    parts = author.middle_name.split('-')
-                    formatted_parts = []
-                    for part in parts:
-                        if part:
-                            formatted_parts.append(self._format_initial(part[0]))
-                    return '-'.join(formatted_parts)
+            if part_type == "last_name":
+                getters.append(attrgetter('last_name'))
+            elif part_type == "first_name":
+                getters.append(attrgetter('first_name'))
+            elif part_type == "middle_name":
+                getters.append(attrgetter('middle_name'))
+            elif part_type == "first_initial":
+                getters.append(lambda author: name_initials(author.first_name))
+            elif part_type == "middle_initial":
+                getters.append(lambda author: name_initials(author.middle_name))
+            elif part_type == "initials":
+                getters.append(lambda author: name_initials(author.first_name) + name_initials(author.middle_name))
+            elif part_type == "comma":
+                getters.append(lambda author: ",")
+            elif part_type == "space":
+                getters.append(lambda author: " ")
+
+        def format_general(author):
+            result = ""
+            previous = None
+            for getter in getters:
+                part = getter(author)
+                if not part:
+                    continue
+                if part in [",", " "]:
+                    result += part
                 else:
-                    return self._format_initial(author.middle_name[0])
-        elif part_type == "initials":
-            return self._get_initials(author)
-        elif part_type == "comma":
-            return ","
-        elif part_type == "space":
-            return " "
-        return ""
+                    if previous is not None and previous not in [",", " "]:
+                        result += " "
+                    result += part
+                previous = part
+            return result.strip()
+
+        return format_general
 
     def _format_initial(self, initial):
         result = initial.upper()
@@ -142,63 +144,62 @@ class AuthorFormatter:
             result += " "
         return result
 
-    def _format_custom(self, author):
-        template = self.config.template
-
-        initials = self._get_initials(author)
+    def _compile_custom(self, name_initials):
+        # Шаблон разбирается один раз; вычисляются только встречающиеся в нем подстановки
+        letters_memo = {"": ""}
 
-        if author.first_name and '-' in author.first_name:
-            parts = author.first_name.split('-')
-            fi_parts = [self._format_initial(p[0]) for p in parts if p]
-            fi_formatted = '-'.join(fi_parts)
-            f_parts = [p[0].upper() for p in parts if p]
-            f_formatted = '-'.join(f_parts)
-        else:
-            fi_formatted = self._format_initial(author.first_name[0]) if author.first_name else ""
-            f_formatted = author.first_name[0].upper() if author.first_name else ""
-
-        if author.middle_name and '-' in author.middle_name:
-            parts = author.middle_name.split('-')
-            mi_parts = [self._format_initial(p[0]) for p in parts if p]
-            mi_formatted = '-'.join(mi_parts)
-            m_parts = [p[0].upper() for p in parts if p]
-            m_formatted = '-'.join(m_parts)
-        else:
-            mi_formatted = self._format_initial(author.middle_name[0]) if author.middle_name else ""
-            m_formatted = author.middle_name[0].upper() if author.middle_name else ""
-
-        replacements = {
-            "{last}": author.last_name,
-            "{first}": author.first_name,
-            "{middle}": author.middle_name,
-            "{fi}": fi_formatted,
-            "{mi}": mi_formatted,
-            "{f}": f_formatted,
-            "{m}": m_formatted,
-            "{l}": author.last_name,
-            "{initials}": initials
+        def name_letters(name):
+            letters = letters_memo.get(name)
+            if letters is None:
+                if '-' in name:
+                    letters = '-'.join(part[0].upper() for part in name.split('-') if part)
+                else:
+                    letters = name[0].upper()
+                letters_memo[name] = letters
+            return letters
+
+        placeholders = {
+            "last": attrgetter('last_name'),
+            "l": attrgetter('last_name'),
+            "first": attrgetter('first_name'),
+            "middle": attrgetter('middle_name'),
+            "fi": lambda author: name_initials(author.first_name),
+            "mi": lambda author: name_initials(author.middle_name),
+            "f": lambda author: name_letters(author.first_name),
+            "m": lambda author: name_letters(author.middle_name),
+            "initials": lambda author: name_initials(author.first_name) + name_initials(author.middle_name),
         }
 
-        for key, value in replacements.items():
-            if value:
-                template = template.replace(key, value)
-
-        return template.strip()
+        segments = []
+        template = self.config.template
+        position = 0
+        for match in _TEMPLATE_PLACEHOLDER_RE.finditer(template):
+            if match.start() > position:
+                segments.append((None, template[position:match.start()]))
+            segments.append((placeholders[match.group(1)], match.group(0)))
+            position = match.end()
+        if position < len(template):
+            segments.append((None, template[position:]))
+
+        if all(getter is None for getter, _ in segments):
+            result = template.strip()
+            return lambda author: result
+
+        def format_custom(author):
+            parts = []
+            for getter, text in segments:
+                if getter is not None:
+                    # Пустое значение оставляет плейсхолдер в тексте, как и раньше
+                    value = getter(author)
+                    if value:
+                        text = value
+                parts.append(text)
+            return ''.join(parts).strip()
+
+        return format_custom
 
     def format_authors(self, authors):
-        if not authors:
-            return ""
-
-        if len(authors) == 1:
-            return self.format_author(authors[0])
-
-        formatted_authors = [self.format_author(author) for author in authors]
-
-        if self.config.include_et_al and len(formatted_authors) > self.config.et_al_limit:
-            main_authors = formatted_authors[:self.config.et_al_limit]
-            return self._join_authors(main_authors) + self.config.and_word + "др."
-
-        return self._join_authors(formatted_authors)
+        return self.compile()(authors)
 
     def _join_authors(self, authors):
         if len(authors) == 1:
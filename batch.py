@@ -0,0 +1,229 @@
+import glob
+import hashlib
+import json
+import os
+import time
+from pathlib import Path
+from version import TOOL_VERSION
+
+OUTPUT_SUFFIX = ".formatted"
+MANIFEST_NAME = ".biblio-manifest.json"
+_HASH_CHUNK_SIZE = 1 << 20
+
+# Состояние рабочего процесса: менеджер и стиль создаются один раз на процесс
+_worker = {}
+
+
+def collect_inputs(pattern, output_dir=None):
+    # Каталог обходится рекурсивно; результаты прошлых запусков (в том числе каталог
+    # output_dir, если он лежит внутри входного) и временные файлы Word пропускаются
+    path = Path(pattern)
+    if path.is_dir():
+        base = path
+        files = path.rglob('*.docx')
+    else:
+        files = [Path(p) for p in glob.glob(pattern, recursive=True)]
+        parents = [str(p.resolve().parent) for p in files]
+        base = Path(os.path.commonpath(parents)) if parents else Path('.')
+
+    excluded = Path(output_dir).resolve() if output_dir is not None else None
+    inputs = sorted(
+        p for p in files
+        if p.is_file() and not p.name.startswith('~$') and not p.stem.endswith(OUTPUT_SUFFIX)
+        and not (excluded is not None and _is_within(p.resolve(), excluded))
+    )
+    return base, inputs
+
+
+def _is_within(path, directory):
+    return path == directory or directory in path.parents
+
+
+def output_path_for(input_path, base, output_dir=None):
+    if output_dir is None:
+        return input_path.with_name(input_path.stem + OUTPUT_SUFFIX + '.docx')
+    relative = input_path.resolve().relative_to(Path(base).resolve())
+    return Path(output_dir) / relative.with_suffix('.docx')
+
+
+def _init_worker(style_data, highlight_missing):
+    from bibliography_manager import BibliographyManager
+    from citation_style import CitationStyle
+
+    manager = BibliographyManager()
+    manager.current_style = CitationStyle.from_dict(style_data)
+    _worker['manager'] = manager
+    _worker['highlight_missing'] = highlight_missing
+
+
+def process_file(input_path, output_path):
+    manager = _worker['manager']
+    result = {'input': str(input_path), 'output': str(output_path), 'items': 0,
+              'invalid': 0, 'seconds': 0.0, 'error': None, 'skipped': False}
+    start = time.perf_counter()
+    try:
+        lines = manager.read_reference_lines(input_path)
+        manager.items = manager._parse_lines(lines, field_mask=manager.style_field_mask())
+        result['items'] = len(manager.items)
+        result['invalid'] = sum(1 for _, missing in manager.format_and_validate_all_items() if missing)
+        output_path = Path(output_path)
+        output_path.parent.mkdir(parents=True, exist_ok=True)
+        # save_to_docx сам пишет через временный файл: при ошибке прежний результат не портится
+        manager.save_to_docx(str(output_path), highlight_missing=_worker['highlight_missing'])
+    except Exception as e:
+        # Ошибка одного файла попадает в отчет и не останавливает пакет
+        result['error'] = f"{type(e).__name__}: {e}"
+    finally:
+        manager.items = []
+    result['seconds'] = time.perf_counter() - start
+    return result
+
+
+def run_batch(jobs, style_data, workers=None, highlight_missing=True):
+    # jobs: список пар (входной файл, выходной файл); результаты возвращаются в том же порядке
+    if not workers or workers <= 1 or len(jobs) <= 1:
+        _init_worker(style_data, highlight_missing)
+        return [process_file(input_path, output_path) for input_path, output_path in jobs]
+
+    from concurrent.futures import ProcessPoolExecutor
+
+    results = [None] * len(jobs)
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                             initargs=(style_data, highlight_missing)) as executor:
+        futures = [executor.submit(process_file, input_path, output_path)
+                   for input_path, output_path in jobs]
+        for i, future in enumerate(futures):
+            try:
+                results[i] = future.result()
+            except Exception as e:
+                input_path, output_path = jobs[i]
+                results[i] = {'input': str(input_path), 'output': str(output_path), 'items': 0,
+                              'invalid': 0, 'seconds': 0.0, 'error': f"{type(e).__name__}: {e}",
+                              'skipped': False}
+    return results
+
+
+def file_hash(path):
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(_HASH_CHUNK_SIZE), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def default_manifest_path(base, output_dir=None):
+    return Path(output_dir if output_dir is not None else base) / MANIFEST_NAME
+
+
+def style_key(style_data, highlight_missing):
+    # Все, что влияет на результат, кроме самого входного файла; при изменении вывода
+    # нужно увеличить OUTPUT_VERSION в version.py, иначе старые результаты будут пропущены
+    from citation_style import CitationStyle
+
+    fingerprint = CitationStyle.from_dict(style_data).fingerprint()
+    return f"{TOOL_VERSION}/{fingerprint}/{int(bool(highlight_missing))}"
+
+
+class BatchManifest:
+    # Входной файл -> ключ (хеш входа, стиль, версия) и хеш результата, как у make
+    def __init__(self, path):
+        self.path = Path(path)
+        self.entries = {}
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                self.entries = json.load(f).get('files', {})
+        except (OSError, ValueError, AttributeError):
+            # Отсутствующий или поврежденный манифест означает полную обработку
+            self.entries = {}
+
+    def _name(self, path):
+        path = Path(path).resolve()
+        try:
+            return os.path.relpath(path, self.path.resolve().parent).replace(os.sep, '/')
+        except ValueError:
+            # В Windows пути на разных дисках не сводятся к относительному
+            return path.as_posix()
+
+    def lookup(self, input_path, output_path, key):
+        entry = self.entries.get(self._name(input_path))
+        if not entry or entry.get('key') != key or entry.get('output') != self._name(output_path):
+            return None
+        try:
+            if file_hash(output_path) != entry.get('output_hash'):
+                return None
+        except OSError:
+            return None
+        return entry
+
+    def record(self, result, key):
+        name = self._name(result['input'])
+        if result['error']:
+            self.entries.pop(name, None)
+            return
+        self.entries[name] = {
+            'key': key,
+            'output': self._name(result['output']),
+            'output_hash': file_hash(result['output']),
+            'items': result['items'],
+            'invalid': result['invalid'],
+        }
+
+    def save(self):
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        temporary = self.path.with_name(self.path.name + '.tmp')
+        with open(temporary, 'w', encoding='utf-8') as f:
+            json.dump({'files': self.entries}, f, ensure_ascii=False, indent=1, sort_keys=True)
+        os.replace(temporary, self.path)
+
+
+def run_incremental(jobs, style_data, manifest, workers=None, highlight_missing=True, force=False):
+    # Файлы с неизменным ключом и нетронутым результатом пропускаются
+    common_key = style_key(style_data, highlight_missing)
+    results = [None] * len(jobs)
+    keys = []
+    pending = []
+    for i, (input_path, output_path) in enumerate(jobs):
+        try:
+            key = f"{common_key}/{file_hash(input_path)}"
+        except OSError:
+            key = None
+        keys.append(key)
+        entry = None if force or key is None else manifest.lookup(input_path, output_path, key)
+        if entry is None:
+            pending.append(i)
+        else:
+            results[i] = {'input': str(input_path), 'output': str(output_path), 'items': entry['items'],
+                          'invalid': entry['invalid'], 'seconds': 0.0, 'error': None, 'skipped': True}
+
+    processed = run_batch([jobs[i] for i in pending], style_data, workers, highlight_missing)
+    for i, result in zip(pending, processed):
+        results[i] = result
+        if keys[i] is None:
+            result['error'] = result['error'] or "Не удалось прочитать входной файл"
+        manifest.record(result, keys[i])
+    manifest.save()
+    return results
+
+
+def summarize(results, seconds):
+    return {
+        'files': results,
+        'total_files': len(results),
+        'failed_files': sum(1 for r in results if r['error']),
+        'skipped_files': sum(1 for r in results if r.get('skipped')),
+        'total_items': sum(r['items'] for r in results),
+        'invalid_items': sum(r['invalid'] for r in results),
+        'seconds': seconds,
+    }
+
+
+def format_report(summary):
+    lines = [f"{'Файл':<40} {'Записей':>8} {'Неполных':>9} {'Время, с':>9}  Статус"]
+    for r in summary['files']:
+        status = r['error'] or ("без изменений" if r.get('skipped') else "ok")
+        lines.append(f"{Path(r['input']).name:<40} {r['items']:>8} {r['invalid']:>9} {r['seconds']:>9.2f}  {status}")
+    lines.append(f"Файлов: {summary['total_files']}, пропущено без изменений: {summary['skipped_files']}, "
+                 f"с ошибками обработки: {summary['failed_files']}, "
+                 f"записей: {summary['total_items']}, без обязательных полей: {summary['invalid_items']}, "
+                 f"время: {summary['seconds']:.2f} с")
+    return "\n".join(lines)
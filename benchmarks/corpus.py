@@ -0,0 +1,179 @@
+import random
+from pathlib import Path
+from docx import Document
+from docx.enum.text import WD_BREAK
+from docx.opc.constants import RELATIONSHIP_TYPE as RT
+from docx.oxml import OxmlElement
+from docx.oxml.ns import qn
+from docx.text.paragraph import Paragraph
+
+LATIN_LAST_NAMES = ["Smith", "Jones", "Garcia Lopez", "O'Neil", "Lee", "Müller", "Nguyen",
+                    "Kowalski", "van der Berg", "Brown-Taylor"]
+CYRILLIC_LAST_NAMES = ["Иванов", "Петров", "Сидорова", "Кузнецов", "Смирнова", "Попов",
+                       "Соколов-Микитов", "Лебедева"]
+LATIN_INITIALS = "ABCDEFGHIJKLMNOPRSTVW"
+CYRILLIC_INITIALS = "АБВГДЕИКЛМНОПРСТ"
+
+TITLES = ["Deep learning for antenna arrays", "On the theory of sparse graphs",
+          "A study of citation formats: part II", "Scalable parsing of bibliographies",
+          "Модели данных для библиографических систем", "Методы оптимизации: обзор",
+          "Распределенные вычисления в науке"]
+JOURNALS = ["IEEE Trans. on Antennas and Propagation", "Journal of Physics", "Nature",
+            "Physical Review Letters", "Труды МФТИ", "Вестник МГУ"]
+CITIES = ["New York", "Moscow", "London", "Санкт-Петербург", "Berlin"]
+PUBLISHERS = ["Springer", "Wiley", "Nauka", "Наука", "MIT Press", "Elsevier"]
+CONFERENCES = ["IEEE Conference on Computer Vision", "ACM Symposium on Theory of Computing",
+               "International Workshop on Data Mining", "Конференция по вычислительной математике"]
+LOCATIONS = ["Berlin", "Vancouver", "Moscow", "Kyoto"]
+SITES = ["example.org", "arxiv.org", "cyberleninka.ru", "docs.python.org"]
+
+PATHOLOGICAL = [
+    "x",
+    "12.",
+    "Просто текст без полей",
+    "Just some text without anything",
+    "doi doi: doi:10.1000/doi.doi DOI 10.1000/DOI.DOI",
+    "url = https://example.org/a?doi=10.1000%2Fq (accessed = [2020-01-01]).",
+    "Smith, J.; ; ; Jones, A. \"Unbalanced title, Nature, vol. , no. , pp. -, 2020.",
+    "Иванов И.И., Петров П.П. «Заголовок в кавычках» // Журнал. – 2020. – Т. 1, № 2. – С. 3–4.",
+    "((Nested (brackets) [and] {braces})). 1999. ISBN = 978-5-0000-0000-0.",
+]
+
+
+class CorpusGenerator:
+    def __init__(self, seed=0):
+        self.random = random.Random(seed)
+
+    def author(self):
+        r = self.random
+        if r.random() < 0.4:
+            last = r.choice(CYRILLIC_LAST_NAMES)
+            first, middle = r.choice(CYRILLIC_INITIALS), r.choice(CYRILLIC_INITIALS)
+        else:
+            last = r.choice(LATIN_LAST_NAMES)
+            first, middle = r.choice(LATIN_INITIALS), r.choice(LATIN_INITIALS)
+        return r.choice([f"{last}, {first}.", f"{last}, {first}.{middle}.", f"{first}. {last}",
+                         f"{first}.{middle}. {last}", f"{last} {first}.", f"{last}, {first}.-{middle}.",
+                         f"{first}.-{middle}. {last}", last])
+
+    def authors(self):
+        r = self.random
+        count = r.choice([1, 1, 2, 2, 3, 4, 6])
+        if r.random() < 0.01:
+            count = 40
+        return r.choice([", ", "; ", " and "]).join(self.author() for _ in range(count))
+
+    def title(self):
+        r = self.random
+        title = r.choice(TITLES)
+        if r.random() < 0.01:
+            title = " ".join([title] * 20)
+        return title
+
+    def doi(self):
+        r = self.random
+        return f"10.{r.randint(1000, 9999)}/{r.choice(['abc', 'j.phys', 'x-y'])}.{r.randint(1, 9999)}"
+
+    def article(self):
+        r = self.random
+        year = r.randint(1950, 2024)
+        pages = f"{r.randint(1, 100)}-{r.randint(101, 200)}"
+        if r.random() < 0.5:
+            return (f'{self.authors()} "{self.title()}," {r.choice(JOURNALS)}, vol. {r.randint(1, 90)}, '
+                    f'no. {r.randint(1, 12)}, pp. {pages}, {year}. doi: {self.doi()}')
+        return (f'{self.authors()}. {self.title()}. {r.choice(JOURNALS)}. {year}, {r.randint(1, 50)}, '
+                f'{pages}. https://doi.org/{self.doi()}.')
+
+    def book(self):
+        r = self.random
+        edition = r.choice(["2nd ed.", "3 edition", "", ""])
+        return (f'{self.authors()}. {self.title()}. {r.choice(CITIES)}: {r.choice(PUBLISHERS)}, '
+                f'{r.randint(1950, 2024)}. {edition} ISBN {r.randint(100, 999)}-{r.randint(1000, 9999)}-X')
+
+    def conference(self):
+        r = self.random
+        pages = f", pp. {r.randint(1, 9)}-{r.randint(10, 20)}" if r.random() < 0.5 else ""
+        return (f'{self.authors()}. {self.title()}. In: Proceedings of the {r.choice(CONFERENCES)} '
+                f'({r.choice(LOCATIONS)}), {r.randint(1990, 2024)}{pages}.')
+
+    def electronic(self):
+        r = self.random
+        url = f"https://www.{r.choice(SITES)}/p{r.randint(1, 9999)}"
+        if r.random() < 0.3:
+            url += f"?doi={self.doi()}"
+        accessed = r.choice(["March 3, 2021", "2020-01-02", "12.05.2019"])
+        return f'{self.authors()}. {self.title()}. Available at {url} (accessed {accessed}).'
+
+    def thesis(self):
+        r = self.random
+        return (f'{self.author()} {self.title()}: дис. ... канд. техн. наук. {r.choice(CITIES)}, '
+                f'{r.randint(1990, 2024)}. {r.randint(100, 250)} с.')
+
+    def report(self):
+        r = self.random
+        return (f'{self.authors()}. {self.title()}. Technical Report TR-{r.randint(1, 999)}, '
+                f'{r.choice(PUBLISHERS)}, {r.randint(1990, 2024)}.')
+
+    def reference(self):
+        r = self.random
+        if r.random() < 0.03:
+            return r.choice(PATHOLOGICAL)
+        return r.choice([self.article, self.article, self.book, self.conference, self.electronic,
+                         self.thesis, self.report])()
+
+    def references(self, count):
+        return [self.reference() for _ in range(count)]
+
+
+def _add_hyperlink(paragraph, url, text, rid):
+    # relate_to ищет совпадение среди всех связей, на больших корпусах это квадратично
+    paragraph.part.rels.add_relationship(RT.HYPERLINK, url, rid, is_external=True)
+    hyperlink = OxmlElement('w:hyperlink')
+    hyperlink.set(qn('r:id'), rid)
+    run = OxmlElement('w:r')
+    t = OxmlElement('w:t')
+    t.text = text
+    run.append(t)
+    hyperlink.append(run)
+    paragraph._p.append(hyperlink)
+
+
+def write_text_corpus(path, references):
+    Path(path).write_text("\n".join(references) + "\n", encoding='utf-8')
+
+
+def write_docx_corpus(path, references, seed=0):
+    r = random.Random(seed)
+    doc = Document()
+    doc.add_heading('Список литературы', 0)
+    # add_paragraph ищет sectPr от начала тела, поэтому абзацы вставляются напрямую
+    sect_pr = doc.element.body.sectPr
+    i = 0
+    while i < len(references):
+        p = OxmlElement('w:p')
+        sect_pr.addprevious(p)
+        para = Paragraph(p, doc._body)
+        para.add_run(f"{i + 1}. ")
+        para.add_run(references[i])
+        i += 1
+        # Часть абзацев содержит несколько записей, разделенных разрывом строки
+        if i < len(references) and r.random() < 0.1:
+            para.add_run().add_break()
+            para.add_run(f"{i + 1}. {references[i]}")
+            i += 1
+        if r.random() < 0.2:
+            _add_hyperlink(para, f"https://example.org/ref/{i}", " ссылка", f"rIdRef{i}")
+        if r.random() < 0.02:
+            para.add_run("\t").add_break(WD_BREAK.PAGE)
+    doc.save(str(path))
+
+
+def build_corpus(directory, count, seed=0):
+    directory = Path(directory)
+    directory.mkdir(parents=True, exist_ok=True)
+    references = CorpusGenerator(seed).references(count)
+    text_path = directory / f"refs_{count}.txt"
+    docx_path = directory / f"refs_{count}.docx"
+    write_text_corpus(text_path, references)
+    write_docx_corpus(docx_path, references, seed)
+    return text_path, docx_path
@@ -0,0 +1,196 @@
+import argparse
+import json
+import platform
+import re
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from bibliography_manager import BibliographyManager, _parse_author_string
+from citation_style import CitationStyle
+from benchmarks.corpus import build_corpus
+
+BASELINE_PATH = Path(__file__).resolve().parent / "baselines.json"
+DEFAULT_SIZES = [1000, 10000, 100000]
+DEFAULT_THRESHOLD = 0.25
+MIN_REGRESSION_SECONDS = 0.01
+
+_CALIBRATION_RE = re.compile(r'(\w+)\s*,\s*(\w)\.')
+
+
+def benchmark_style():
+    style = CitationStyle("Бенчмарк")
+    style.set_field_order(['authors_str', 'title', 'journal', 'conference_name', 'city',
+                           'publisher', 'year', 'volume', 'issue', 'pages', 'edition',
+                           'isbn', 'location', 'website', 'url', 'doi', 'accessed_date'])
+    style.set_required_fields(['authors_str', 'title', 'year', 'publisher'])
+    style.set_field_format('title', 'quotes')
+    style.set_field_format('journal', 'italic')
+    for field in ('volume', 'issue', 'pages', 'doi', 'url'):
+        style.set_field_prefix(field, True)
+    return style
+
+
+def calibrate(repeat=5):
+    # Эталонная нагрузка: пересчитывает базовые значения под скорость текущей машины
+    text = "Smith, J. Jones, A. Иванов, И. " * 200
+
+    def workload():
+        total = 0
+        for _ in range(200):
+            total += len(_CALIBRATION_RE.findall(text))
+            total += len(sorted(text.split()))
+        return total
+
+    return _best_time(workload, repeat)
+
+
+def _best_time(func, repeat, setup=None):
+    # setup выполняется перед каждым повтором и в замер не входит
+    best = None
+    for _ in range(repeat):
+        if setup is not None:
+            setup()
+        start = time.perf_counter()
+        func()
+        elapsed = time.perf_counter() - start
+        if best is None or elapsed < best:
+            best = elapsed
+    return best
+
+
+def run_size(size, workdir, repeat=3, seed=0):
+    text_path, docx_path = build_corpus(workdir, size, seed)
+    lines = [line for line in text_path.read_text(encoding='utf-8').splitlines() if line.strip()]
+    output_path = Path(workdir) / f"out_{size}.docx"
+
+    manager = BibliographyManager()
+    manager.current_style = benchmark_style()
+    results = {}
+
+    def parse_docx():
+        manager.items = manager.parse_docx(str(docx_path))
+
+    def save_to_docx():
+        manager.save_to_docx(str(output_path))
+
+    # Холодные замеры: каждый повтор начинается без кэшей, иначе со второго
+    # повтора измеряется попадание в кэш, а не разбор и форматирование
+    cold_parse = _parse_author_string.cache_clear
+    cold_format = manager.clear_format_cache
+    results['parse_docx'] = _best_time(parse_docx, repeat, cold_parse)
+    results['parse_text'] = _best_time(lambda: manager._parse_lines(lines), repeat, cold_parse)
+    results['format_all_items'] = _best_time(manager.format_all_items, repeat, cold_format)
+    results['validate_all_items'] = _best_time(manager.validate_all_items, repeat, cold_format)
+    results['save_to_docx'] = _best_time(save_to_docx, repeat, cold_format)
+
+    # Теплые замеры: повторный вывод после того, как все записи уже отформатированы
+    manager.format_and_validate_all_items()
+    results['format_all_items_warm'] = _best_time(manager.format_all_items, repeat)
+    results['save_to_docx_warm'] = _best_time(save_to_docx, repeat)
+    return results
+
+
+def load_baseline(path=BASELINE_PATH):
+    path = Path(path)
+    if not path.exists():
+        return None
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def save_baseline(results, calibration, path=BASELINE_PATH):
+    data = {
+        'python': platform.python_version(),
+        'calibration': calibration,
+        'results': results,
+    }
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(data, f, ensure_ascii=False, indent=2, sort_keys=True)
+        f.write("\n")
+
+
+def compare(results, calibration, baseline, threshold=DEFAULT_THRESHOLD):
+    scale = calibration / baseline['calibration'] if baseline.get('calibration') else 1.0
+    regressions = []
+    report = []
+    for size, timings in results.items():
+        expected_timings = baseline['results'].get(size, {})
+        for name, elapsed in timings.items():
+            expected = expected_timings.get(name)
+            if expected is None:
+                report.append((size, name, elapsed, None, ""))
+                continue
+            expected *= scale
+            ratio = elapsed / expected if expected else 0.0
+            regressed = ratio > 1 + threshold and elapsed - expected > MIN_REGRESSION_SECONDS
+            status = "РЕГРЕСС" if regressed else ""
+            if status:
+                regressions.append((size, name, ratio))
+            report.append((size, name, elapsed, ratio, status))
+    return report, regressions
+
+
+def print_report(report):
+    print(f"{'Размер':>8}  {'Операция':<22} {'Время, с':>10} {'К базе':>8}")
+    for size, name, elapsed, ratio, status in report:
+        ratio_text = f"{ratio:.2f}" if ratio is not None else "—"
+        print(f"{size:>8}  {name:<22} {elapsed:>10.3f} {ratio_text:>8} {status}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Бенчмарк разбора и форматирования библиографии')
+    parser.add_argument('--sizes', type=int, nargs='+', default=DEFAULT_SIZES,
+                        help='Размеры корпусов (число записей)')
+    parser.add_argument('--repeat', type=int, default=3, help='Число повторов каждого замера')
+    parser.add_argument('--seed', type=int, default=0, help='Зерно генератора корпуса')
+    parser.add_argument('--threshold', type=float, default=DEFAULT_THRESHOLD,
+                        help='Допустимое замедление относительно базы (0.25 = 25%%)')
+    parser.add_argument('--baseline', type=str, default=str(BASELINE_PATH),
+                        help='JSON файл с базовыми значениями')
+    parser.add_argument('--update-baseline', action='store_true',
+                        help='Записать текущие результаты как базовые')
+    parser.add_argument('--corpus-dir', type=str,
+                        help='Каталог для сохранения сгенерированных корпусов')
+    args = parser.parse_args(argv)
+
+    calibration = calibrate()
+    results = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        workdir = args.corpus_dir or tmp
+        for size in args.sizes:
+            results[str(size)] = run_size(size, workdir, args.repeat, args.seed)
+
+    baseline = load_baseline(args.baseline)
+    if args.update_baseline:
+        if baseline:
+            # Размеры, которые не запускались, сохраняют прежние значения
+            scale = calibration / baseline['calibration'] if baseline.get('calibration') else 1.0
+            merged = {size: {name: value * scale for name, value in timings.items()}
+                      for size, timings in baseline['results'].items()}
+            merged.update(results)
+            results = merged
+        save_baseline(results, calibration, args.baseline)
+        print(f"Базовые значения записаны в {args.baseline}")
+        return 0
+
+    if baseline is None:
+        report = [(size, name, elapsed, None, "") for size, timings in results.items()
+                  for name, elapsed in timings.items()]
+        print_report(report)
+        print("Базовые значения не найдены, сравнение пропущено")
+        return 0
+
+    report, regressions = compare(results, calibration, baseline, args.threshold)
+    print_report(report)
+    if regressions:
+        print(f"Обнаружено замедление более чем на {args.threshold:.0%}: {len(regressions)}")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
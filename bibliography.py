@@ -13,7 +13,32 @@ class ResourceType(Enum):
     ELECTRONIC = "Электронный ресурс"
     OTHER = "Другое"
 
+class LazyField:
+    def __set_name__(self, owner, name):
+        self.name = name
+
+    def __get__(self, obj, objtype=None):
+        if obj is None:
+            return self
+        deferred = obj.__dict__.get('_deferred')
+        if not deferred or self.name not in deferred:
+            raise AttributeError(self.name)
+        if deferred[self.name] is None:
+            obj._restore_extractors()
+        value = deferred.pop(self.name)()
+        obj.__dict__[self.name] = value
+        return value
+
 class BibliographicItem:
+    FIELDS = ('resource_type', 'authors', 'authors_str', 'title', 'year',
+              'publisher', 'url', 'doi', 'accessed_date')
+
+    year = LazyField()
+    publisher = LazyField()
+    url = LazyField()
+    doi = LazyField()
+    accessed_date = LazyField()
+
     def __init__(self, resource_type=ResourceType.ARTICLE,
                  authors=None,
                  title="", year=0, publisher="",
@@ -28,17 +53,81 @@ class BibliographicItem:
         self.accessed_date = accessed_date
 
     def get_all_fields(self):
-        return {
-            'resource_type': self.resource_type.value,
-            'authors': [f"{a.last_name} {a.first_name} {a.middle_name}".strip() for a in self.authors],
-            'authors_str': self.format_authors(),
-            'title': self.title,
-            'year': self.year,
-            'publisher': self.publisher,
-            'url': self.url,
-            'doi': self.doi,
-            'accessed_date': self.accessed_date
-        }
+        return self.get_fields(self.FIELDS)
+
+    def get_fields(self, names):
+        fields = {}
+        for name in names:
+            if name not in self.FIELDS:
+                continue
+            if name == 'resource_type':
+                fields[name] = self.resource_type.value
+            elif name == 'authors':
+                fields[name] = [f"{a.last_name} {a.first_name} {a.middle_name}".strip() for a in self.authors]
+            elif name == 'authors_str':
+                fields[name] = self.format_authors()
+            else:
+                fields[name] = getattr(self, name)
+        return fields
+
+    def __setattr__(self, name, value):
+        super().__setattr__(name, value)
+        # Присвоенное значение заменяет отложенное извлечение поля
+        deferred = self.__dict__.get('_deferred')
+        if deferred:
+            deferred.pop(name, None)
+        self.touch()
+
+    @property
+    def version(self):
+        return self.__dict__.get('_version', 0)
+
+    def touch(self):
+        # Изменения списков на месте (authors.append) нужно отмечать вручную
+        self.__dict__['_version'] = self.__dict__.get('_version', 0) + 1
+
+    def defer_field(self, name, extractor):
+        self.__dict__.pop(name, None)
+        self.__dict__.setdefault('_deferred', {})[name] = extractor
+        self.touch()
+
+    def set_deferred_source(self, source):
+        # source() заново создает словарь извлекателей; в отличие от них, сериализуется pickle
+        self.__dict__['_deferred_source'] = source
+
+    def resolve_fields(self):
+        for name in list(self.__dict__.get('_deferred', ())):
+            getattr(self, name)
+        self.__dict__.pop('_deferred', None)
+        self.__dict__.pop('_deferred_source', None)
+
+    def __getstate__(self):
+        deferred = self.__dict__.get('_deferred')
+        if not deferred:
+            state = dict(self.__dict__)
+            state.pop('_deferred', None)
+            state.pop('_deferred_source', None)
+            return state
+        if '_deferred_source' not in self.__dict__:
+            self.resolve_fields()
+            return self.__dict__
+        # Отложенные поля передаются как есть: источник и имена еще не извлеченных полей
+        state = dict(self.__dict__)
+        state['_deferred'] = list(deferred)
+        return state
+
+    def __setstate__(self, state):
+        # Извлекатели восстанавливаются при первом обращении к отложенному полю
+        self.__dict__.update(state)
+        names = state.get('_deferred')
+        if names:
+            self.__dict__['_deferred'] = dict.fromkeys(names)
+
+    def _restore_extractors(self):
+        deferred = self.__dict__['_deferred']
+        extractors = self.__dict__['_deferred_source']()
+        for name in deferred:
+            deferred[name] = extractors[name]
 
     def format_authors(self, author_formatter=None):
         if not self.authors:
@@ -47,24 +136,25 @@ class BibliographicItem:
         if author_formatter:
             return author_formatter.format_authors(self.authors)
 
-        if len(self.authors) == 1:
-            author = self.authors[0]
+        authors = self.authors[:4]
+        if len(authors) == 1:
+            author = authors[0]
             return author.format(author_formatter)
 
         formatted = []
-        for author in self.authors:
+        for author in authors[:3]:
             formatted.append(author.format(author_formatter))
 
-        if len(formatted) == 2:
+        if len(authors) == 2:
             return f"{formatted[0]} и {formatted[1]}"
-        elif len(formatted) == 3:
+        elif len(authors) == 3:
             return f"{formatted[0]}, {formatted[1]} и {formatted[2]}"
         else:
             return f"{formatted[0]} и др."
 
     def get_missing_fields(self, required_fields):
         missing = []
-        fields = self.get_all_fields()
+        fields = self.get_fields(required_fields)
 
         for field_name in required_fields:
             value = fields.get(field_name)
@@ -77,6 +167,13 @@ class BibliographicItem:
         return f"{self.format_authors()}. {self.title}. {self.year}."
 
 class Article(BibliographicItem):
+    FIELDS = BibliographicItem.FIELDS + ('journal', 'volume', 'issue', 'pages')
+
+    journal = LazyField()
+    volume = LazyField()
+    issue = LazyField()
+    pages = LazyField()
+
     def __init__(self, authors=None, title="", year=0,
                  publisher="", url="", doi="", accessed_date="",
                  journal="", volume="", issue="", pages=""):
@@ -86,17 +183,13 @@ class Article(BibliographicItem):
         self.issue = issue
         self.pages = pages
 
-    def get_all_fields(self):
-        fields = super().get_all_fields()
-        fields.update({
-            'journal': self.journal,
-            'volume': self.volume,
-            'issue': self.issue,
-            'pages': self.pages
-        })
-        return fields
-
 class Book(BibliographicItem):
+    FIELDS = BibliographicItem.FIELDS + ('edition', 'isbn', 'city')
+
+    edition = LazyField()
+    isbn = LazyField()
+    city = LazyField()
+
     def __init__(self, authors=None, title="", year=0,
                  publisher="", url="", doi="", accessed_date="",
                  edition="", isbn="", city=""):
@@ -105,16 +198,13 @@ class Book(BibliographicItem):
         self.isbn = isbn
         self.city = city
 
-    def get_all_fields(self):
-        fields = super().get_all_fields()
-        fields.update({
-            'edition': self.edition,
-            'isbn': self.isbn,
-            'city': self.city
-        })
-        return fields
-
 class ConferencePaper(BibliographicItem):
+    FIELDS = BibliographicItem.FIELDS + ('conference_name', 'location', 'pages')
+
+    conference_name = LazyField()
+    location = LazyField()
+    pages = LazyField()
+
     def __init__(self, authors=None, title="", year=0,
                  publisher="", url="", doi="", accessed_date="",
                  conference_name="", location="", pages=""):
@@ -123,25 +213,20 @@ class ConferencePaper(BibliographicItem):
         self.location = location
         self.pages = pages
 
-    def get_all_fields(self):
-        fields = super().get_all_fields()
-        fields.update({
-            'conference_name': self.conference_name,
-            'location': self.location,
-            'pages': self.pages
-        })
-        return fields
-
 class ElectronicResource(BibliographicItem):
+    FIELDS = BibliographicItem.FIELDS + ('website',)
+
+    website = LazyField()
+
     def __init__(self, authors=None, title="", year=0,
                  publisher="", url="", doi="", accessed_date="",
                  website=""):
         super().__init__(ResourceType.ELECTRONIC, authors, title, year, publisher, url, doi, accessed_date)
         self.website = website
 
-    def get_all_fields(self):
-        fields = super().get_all_fields()
-        fields.update({
-            'website': self.website
-        })
-        return fields
\ No newline at end of file
+ITEM_CLASSES = {
+    ResourceType.ARTICLE: Article,
+    ResourceType.BOOK: Book,
+    ResourceType.CONFERENCE: ConferencePaper,
+    ResourceType.ELECTRONIC: ElectronicResource,
+}
@@ -1,18 +1,281 @@
 import re
 import json
+import hashlib
+import weakref
+from difflib import SequenceMatcher
+from functools import lru_cache, partial
+from itertools import repeat
 from typing import List, Optional, Tuple, Dict, Any
 from pathlib import Path
-from docx import Document
-from docx.shared import RGBColor
-from docx.oxml.ns import qn
 from bibliography import *
 from citation_style import CitationStyle
-from author import Author
+from author import AuthorList, intern_author
+from docx_reader import iter_docx_paragraphs, paragraph_text
+from docx_writer import render_entry_body, render_number, write_docx
+from version import PARSER_VERSION
+from reference_classifier import (REFERENCE_CLASSIFIER, ARTICLE_NUMBERS_RE, FEATURE_ARTICLE,
+                                  FEATURE_BOOK, FEATURE_CONFERENCE, FEATURE_ELECTRONIC)
+
+_WHITESPACE_RE = re.compile(r'\s+')
+_FIELD_ASSIGNMENT_RE = re.compile(r'^\s*(\w+)\s*=\s*')
+_NUMBERED_SPLIT_RE = re.compile(r'\n\s*\d+\.\s*')
+_LEADING_NUMBER_RE = re.compile(r'^\s*\d+\.\s*')
+_YEAR_RE = re.compile(r'\b(19|20)\d{2}\b')
+_URL_RE = re.compile(r'(https?://[^\s<>"\']+|www\.[^\s<>"\']+)', re.IGNORECASE)
+_DOI_WITH_PREFIX_RE = re.compile(r'\bdoi\b\s*[:]?\s*10\.[^\s,;]+', re.IGNORECASE)
+_DOI_RE = re.compile(r'\bdoi\b\s*[:]?\s*([^\s,;]+)', re.IGNORECASE)
+_DOI_ORG_RE = re.compile(r'https?://doi\.org/([^\s,;]+)', re.IGNORECASE)
+
+_QUOTE_TITLE_PATTERNS = [
+    re.compile(r'["\u201c](.*?)["\u201d]'),
+    re.compile(r'["\'](.*?)["\']'),
+]
+_TITLE_TRAILING_PUNCT_RE = re.compile(r'[.,;:\s]+$')
+_SEMICOLON_AUTHORS_RE = re.compile(r'^(.*?[A-Za-z]+,\s*[A-Z]\.(?:\.[A-Z])?\.)\s+(.*)$')
+_SEMICOLON_TITLE_PATTERNS = [
+    re.compile(r'^(.*?)(?:\.\s+[A-Z]\.)'),
+    re.compile(r'^(.*?)(?:\.\s+[A-Z][a-z])'),
+    re.compile(r'^(.*?)(?:\.\s+\d{4})'),
+]
+_AUTHORS_TITLE_RE = re.compile(r'^(.*?\.)\s+([A-Z].*?)(?=\.\s+[A-Z]|\.\s*\d{4}|,\s*\d{4}|$)', re.DOTALL)
+
+_LONE_INITIAL_RE = re.compile(r'^[A-Z]\.?$')
+_INITIAL_LAST_FINDALL_RE = re.compile(r'([A-Z]\.\s+[A-Z][a-z]+)')
+_HYPHEN_INITIALS_RE = re.compile(r'([A-Z])\.-([A-Z])\.')
+_INITIALS_STRIP_RE = re.compile(r'[.\s]')
+_HYPHEN_INITIALS_LAST_NAMES_RE = re.compile(r'^([A-Z])\.-([A-Z])\.\s+([A-Z][a-z]+(?:\s+[A-Z][a-z]+)*)$')
+_INITIAL_LAST_NAMES_RE = re.compile(r'^([A-Z])\.?\s+([A-Z][a-z]+(?:\s+[A-Z][a-z]+)*)$')
+_HYPHEN_INITIALS_LAST_RE = re.compile(r'^([A-Z])\.-([A-Z])\.\s+([A-Z][a-z]+)$')
+_TWO_INITIALS_LAST_RE = re.compile(r'^([A-Z])\.\s*([A-Z])\.?\s+([A-Z][a-z]+)$')
+_LAST_INITIALS_RE = re.compile(r'^([A-Z][a-z]+)\s+([A-Z])\.?\s*([A-Z])?\.?$')
+_LAST_HYPHEN_INITIALS_RE = re.compile(r'^([A-Z][a-z]+)\s+([A-Z])\.-([A-Z])\.$')
+_LAST_NAME_ONLY_RE = re.compile(r'^[A-Z][a-z]+$')
+
+_ACCESSED_DATE_PATTERNS = [
+    re.compile(r'\b(?:accessed|retrieved)\b\s*(?:on\s*)?([A-Za-z]+\s+\d{1,2},\s*\d{4})', re.IGNORECASE),
+    re.compile(r'\b(?:accessed|retrieved)\b\s*(?:on\s*)?(\d{4}-\d{2}-\d{2})', re.IGNORECASE),
+    re.compile(r'\b(?:accessed|retrieved)\b\s*(?:on\s*)?(\d{1,2}\.\d{1,2}\.\d{4})', re.IGNORECASE),
+    re.compile(r'\[\s*(?:accessed|retrieved)\s*[:]?\s*([^\]]+)\]', re.IGNORECASE),
+]
+_PUBLISHER_LABEL_RE = re.compile(r'\bpublisher\s*[:]?\s*([^.,;]+)', re.IGNORECASE)
+_CITY_PUBLISHER_RE = re.compile(r'([A-Z][a-z]+(?:\s+[A-Z][a-z]+)*)\s*:\s*([^.,;]+)')
+_ISBN_RE = re.compile(r'\bISBN\b\s*[:]?\s*([0-9Xx\-]+)')
+_EDITION_PATTERNS = [
+    re.compile(r'\b(\d+(?:st|nd|rd|th)\s+ed\.?)(?!\w)', re.IGNORECASE),
+    re.compile(r'\b(\d+\s*ed(?:ition)?\.?)(?!\w)', re.IGNORECASE),
+    re.compile(r'\b(ed\.?\s*\d+)\b', re.IGNORECASE),
+    re.compile(r'\b(rev\.?\s*ed\.?)\b', re.IGNORECASE),
+]
+_WEBSITE_RE = re.compile(r"\b(?:on|at)\s+([^.,;]+)\s*(?:website|site)\b", re.IGNORECASE)
+
+_JOURNAL_PATTERNS = [
+    re.compile(r'(IEEE\s+Trans\.\s+on\s+[^.,]+)'),
+    re.compile(r'(IEEE\s+Trans\.\s+[^.,]+)'),
+    re.compile(r'\.\s*([A-Z][^.,]*(?:\s+[A-Z][^.,]*)*)(?=\s*[,\\.])'),
+]
+_CAPITALIZED_START_RE = re.compile(r'^[A-Z]')
+_JOURNAL_EXCLUDED_WORDS_RE = re.compile(r'\b(vol|no|pp|p|doi|http)\b', re.I)
+_FOUR_DIGITS_RE = re.compile(r'\d{4}')
+_VOLUME_PATTERNS = [
+    re.compile(r'\b[Vv]olume\b\s*[:]?\s*(\d+|[IVXLCDM]+)'),
+    re.compile(r'[Vv]ol\.?\s*[:]?\s*(\d+|[IVXLCDM]+)'),
+    re.compile(r',\s*(\d+)\s*,'),
+    re.compile(r'\.\s*(\d+)\s*,'),
+]
+_ISSUE_PATTERNS = [
+    re.compile(r'\b(?:no\.|no|issue)\b\s*[:]?\s*(\d+)\b'),
+    re.compile(r'\b\d+\s*\(\s*(\d+)\s*\)\b'),
+]
+_PAGES_PATTERNS = [
+    re.compile(r'[Pp]p?\.?\s*[:]?\s*(\d+[-–]\d+)'),
+    re.compile(r'\b(\d+)\s*[-–]\s*(\d+)\b'),
+    re.compile(r',\s*(\d+[-–]\d+)\s*\.'),
+    re.compile(r',\s*(\d+[-–]\d+)\s*,'),
+]
+
+_CONFERENCE_NAME_RE = re.compile(r'\b[Ii]n\s*:?\s*([^.,]+)')
+_PARENTHESIZED_RE = re.compile(r'\(([^\)]+)\)')
+_DIGIT_RE = re.compile(r'\d')
+_LOCATION_RE = re.compile(r',\s*([A-Z][a-z]+(?:\s+[A-Z][a-z]+)*?(?:,\s*[A-Z][a-z]+)?)\s*[\.,]')
+_CONFERENCE_PUBLISHER_RE = re.compile(r'\b(IEEE|ACM|Springer|Elsevier)\b')
+
+PARALLEL_MIN_LINES = 2000
+PARALLEL_BATCH_SIZE = 500
+AUTHOR_CACHE_SIZE = 65536
+
+def _is_word_char(c):
+    return c.isalnum() or c == '_'
+
+def _once(func):
+    result = []
+
+    def wrapper():
+        if not result:
+            result.append(func())
+        return result[0]
+    return wrapper
+
+def _parse_reference_batch(manager_cls, lines, manager=None, keep_empty=False, field_mask=None):
+    if manager is None:
+        manager = manager_cls()
+    items = []
+    for line in lines:
+        if field_mask is None:
+            item = manager._parse_reference(line)
+        else:
+            item = manager._parse_reference(line, field_mask)
+        if item or keep_empty:
+            items.append(item)
+    return items
+
+def _parse_author_entry(author_str):
+    if not author_str:
+        return None
+    return _parse_author_string(author_str.strip().rstrip(','))
+
+def _parse_author_entries(entries):
+    authors = []
+    for entry in entries:
+        author = _parse_author_entry(entry)
+        if author and author.last_name:
+            authors.append(author)
+    return authors
+
+_extractor_managers = {}
+
+def _field_extractors(manager_cls, kind, text, rest):
+    # Восстановление отложенных полей после pickle, например в рабочем процессе
+    manager = _extractor_managers.get(manager_cls)
+    if manager is None:
+        manager = _extractor_managers[manager_cls] = manager_cls()
+    return getattr(manager, kind)(text, rest)
+
+def _docx_document():
+    # python-docx загружается при первом обращении, Document при этом остается атрибутом модуля
+    if 'Document' not in globals():
+        from docx import Document
+        globals()['Document'] = Document
+    return globals()['Document']
+
+def __getattr__(name):
+    if name == 'Document':
+        return _docx_document()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+@lru_cache(maxsize=8)
+def _worker_style_plan(style_json):
+    # В рабочем процессе стиль восстанавливается и компилируется один раз на все пакеты
+    return CitationStyle.from_dict(json.loads(style_json)).compile()
+
+def _render_entry_batch(style_json, items, highlight_missing):
+    # Абзацы возвращаются готовым XML без номеров, строка и недостающие поля - для кэша родителя
+    plan = _worker_style_plan(style_json)
+    entries = []
+    for item in items:
+        if highlight_missing:
+            formatted, missing = plan.format_and_validate(item)
+        else:
+            formatted, missing = plan.format_item(item), None
+        entries.append((formatted, missing, render_entry_body(formatted, missing).encode('utf-8')))
+    return entries
+
+@lru_cache(maxsize=AUTHOR_CACHE_SIZE)
+def _parse_author_string(author_str):
+    hyphen_match = _HYPHEN_INITIALS_RE.search(author_str)
+    if hyphen_match:
+        if ',' in author_str:
+            parts = [p.strip() for p in author_str.split(',', 1)]
+            if len(parts) == 2:
+                last_name = parts[0]
+                hyphen_initials = _HYPHEN_INITIALS_RE.search(parts[1])
+                if hyphen_initials:
+                    return intern_author(last_name=last_name,
+                                         first_name=f"{hyphen_initials.group(1)}-{hyphen_initials.group(2)}")
+
+        match = _HYPHEN_INITIALS_LAST_NAMES_RE.match(author_str)
+        if match:
+            return intern_author(last_name=match.group(3),
+                                 first_name=f"{match.group(1)}-{match.group(2)}")
+
+    if ',' in author_str:
+        parts = [p.strip() for p in author_str.split(',', 1)]
+        if len(parts) == 2:
+            last_name = parts[0]
+            initials = parts[1]
+            initials_clean = _INITIALS_STRIP_RE.sub('', initials)
+
+            if '-' in initials_clean:
+                return intern_author(last_name=last_name, first_name=initials_clean)
+
+            if '.' in initials and len(initials_clean) >= 2:
+                if len(initials_clean) == 2:
+                    return intern_author(last_name=last_name,
+                                         first_name=initials_clean[0],
+                                         middle_name=initials_clean[1])
+                elif len(initials_clean) > 2:
+                    if len(initials_clean) <= 4 and all(c.isupper() for c in initials_clean):
+                        return intern_author(last_name=last_name,
+                                             first_name=initials_clean[0],
+                                             middle_name=initials_clean[-1])
+                    else:
+                        return intern_author(last_name=last_name, first_name=initials_clean)
+
+            if len(initials_clean) >= 2:
+                return intern_author(last_name=last_name,
+                                     first_name=initials_clean[0],
+                                     middle_name=initials_clean[1])
+            elif len(initials_clean) == 1:
+                return intern_author(last_name=last_name,
+                                     first_name=initials_clean[0])
+
+            return intern_author(last_name=last_name)
+
+    match = _INITIAL_LAST_NAMES_RE.match(author_str)
+    if match:
+        return intern_author(last_name=match.group(2),
+                             first_name=match.group(1))
+
+    match = _HYPHEN_INITIALS_LAST_RE.match(author_str)
+    if match:
+        return intern_author(last_name=match.group(3),
+                             first_name=f"{match.group(1)}-{match.group(2)}")
+
+    match = _TWO_INITIALS_LAST_RE.match(author_str)
+    if match:
+        return intern_author(last_name=match.group(3),
+                             first_name=match.group(1),
+                             middle_name=match.group(2))
+
+    match = _LAST_INITIALS_RE.match(author_str)
+    if match:
+        return intern_author(last_name=match.group(1),
+                             first_name=match.group(2),
+                             middle_name=match.group(3) if match.group(3) else "")
+
+    match = _LAST_HYPHEN_INITIALS_RE.match(author_str)
+    if match:
+        return intern_author(last_name=match.group(1),
+                             first_name=f"{match.group(2)}-{match.group(3)}")
+
+    if _LAST_NAME_ONLY_RE.match(author_str):
+        return intern_author(last_name=author_str)
+
+    return None
 
 class BibliographyManager:
-    def __init__(self):
+    # Число авторов, разбираемых сразу; None отключает компактное хранение
+    AUTHOR_LIST_HEAD = 16
+    # Сколько последних DOCX хранят разметку абзацев для повторной загрузки
+    LOADED_DOCUMENTS_LIMIT = 4
+
+    def __init__(self, reference_cache=None):
         self.items: List[BibliographicItem] = []
         self.current_style: Optional[CitationStyle] = None
+        self.reference_cache = reference_cache
+        self._loaded_documents = {}
+        self._format_cache = weakref.WeakKeyDictionary()
+        self._format_state = None
+        self._style_plan = None
         self.available_fields = [
             'authors_str', 'title', 'year', 'journal', 'volume',
             'issue', 'pages', 'publisher', 'edition', 'isbn', 'city',
@@ -23,6 +286,11 @@ class BibliographyManager:
     def add_item(self, item):
         self.items.append(item)
 
+    def style_field_mask(self):
+        if not self.current_style:
+            return None
+        return self.current_style.get_used_fields()
+
     def _clean_extracted_value(self, value, field_name=""):
         if value is None:
             return ""
@@ -31,7 +299,9 @@ class BibliographyManager:
             return ""
 
         if field_name:
-            v = re.sub(rf'^\s*{re.escape(field_name)}\s*=\s*', '', v, flags=re.IGNORECASE)
+            m = _FIELD_ASSIGNMENT_RE.match(v)
+            if m and m.group(1).lower() == field_name.lower():
+                v = v[m.end():]
 
         while v.startswith('='):
             v = v[1:].lstrip()
@@ -45,104 +315,214 @@ class BibliographyManager:
         v = v.rstrip()
         return v
 
-    def _extract_hyperlinks_from_paragraph(self, para):
-        urls = []
-        try:
-            for h in para._p.xpath('.//w:hyperlink'):
-                rid = h.get(qn('r:id'))
-                if not rid:
-                    continue
-                rel = para.part.rels.get(rid)
-                if not rel:
-                    continue
-                target = getattr(rel, 'target_ref', None) or getattr(rel, 'target', None)
-                if not target:
-                    continue
-                urls.append(str(target))
-        except Exception:
-            return []
+    def _index_hyperlinks(self, doc):
+        from docx.oxml.ns import qn
 
-        seen = set()
-        out = []
-        for u in urls:
-            if u not in seen:
-                seen.add(u)
-                out.append(u)
-        return out
+        targets = {}
+        for rid, rel in doc.part.rels.items():
+            target = getattr(rel, 'target_ref', None) or getattr(rel, 'target', None)
+            if target:
+                targets[rid] = str(target)
 
-    def parse_docx(self, filepath):
-        items = []
-        doc = Document(filepath)
+        body = doc.element.body
+        index = {}
+        for h in body.iter(qn('w:hyperlink')):
+            target = targets.get(h.get(qn('r:id')))
+            if not target:
+                continue
+            block = h
+            while block.getparent() is not body:
+                block = block.getparent()
+            index.setdefault(block, {})[target] = None
+        return index
+
+    def _read_docx_paragraphs(self, filepath):
+        from docx.oxml.ns import qn
 
-        for para in doc.paragraphs:
-            text = para.text.strip()
+        doc = _docx_document()(filepath)
+        hyperlinks = self._index_hyperlinks(doc)
+
+        for p in doc.element.body.iterchildren(qn('w:p')):
+            text = paragraph_text(p).strip()
             if not text:
                 continue
 
-            urls = self._extract_hyperlinks_from_paragraph(para)
+            yield text, list(hyperlinks.get(p, ()))
+
+    def parse_docx(self, filepath, workers=None, field_mask=None):
+        lines = []
+        for text, urls in self._read_docx_paragraphs(filepath):
+            lines.extend(self._split_paragraph(text, urls))
+
+        return self._parse_lines(lines, workers, field_mask=field_mask)
+
+    def load_docx(self, filepath, workers=None, field_mask=None):
+        key = str(Path(filepath).resolve())
+        previous = self._loaded_documents.get(key, [])
+        paragraphs = list(self._read_docx_paragraphs(filepath))
+        fingerprints = [self._paragraph_fingerprint(text, urls) for text, urls in paragraphs]
+
+        segments = [None] * len(paragraphs)
+        matcher = SequenceMatcher(None, [fp for fp, _ in previous], fingerprints, autojunk=False)
+        for tag, i1, i2, j1, j2 in matcher.get_opcodes():
+            if tag == 'equal':
+                for offset in range(j2 - j1):
+                    segments[j1 + offset] = previous[i1 + offset][1]
+
+        changed = [j for j, segment in enumerate(segments) if segment is None]
+        changed_lines = [self._split_paragraph(*paragraphs[j]) for j in changed]
+        parsed = self._parse_lines([line for lines in changed_lines for line in lines],
+                                   workers, keep_empty=True, field_mask=field_mask)
+        pos = 0
+        for j, lines in zip(changed, changed_lines):
+            segments[j] = [item for item in parsed[pos:pos + len(lines)] if item]
+            pos += len(lines)
+
+        old_items = [item for _, segment in previous for item in segment]
+        new_items = [item for segment in segments for item in segment]
+        self._replace_items(old_items, new_items)
+        # Документ переносится в конец: словарь упорядочен от давно загружавшихся к последним
+        self._loaded_documents.pop(key, None)
+        self._loaded_documents[key] = list(zip(fingerprints, segments))
+        while len(self._loaded_documents) > self.LOADED_DOCUMENTS_LIMIT:
+            del self._loaded_documents[next(iter(self._loaded_documents))]
+        return new_items
+
+    def clear_items(self):
+        # Вместе с записями забывается и разметка загруженных документов, которая на них ссылается
+        self.items.clear()
+        self._loaded_documents.clear()
+
+    def _paragraph_fingerprint(self, text, urls):
+        payload = '\x00'.join([text] + list(urls)).encode('utf-8')
+        return hashlib.blake2b(payload, digest_size=16).digest()
+
+    def _replace_items(self, old_items, new_items):
+        old_ids = {id(item) for item in old_items}
+        result = []
+        inserted = False
+        for item in self.items:
+            if id(item) in old_ids:
+                if not inserted:
+                    result.extend(new_items)
+                    inserted = True
+                continue
+            result.append(item)
+        if not inserted:
+            result.extend(new_items)
+        self.items[:] = result
+
+    def _parse_lines(self, lines, workers=None, keep_empty=False, field_mask=None):
+        if self.reference_cache is None:
+            return self._parse_uncached_lines(lines, workers, keep_empty, field_mask)
+
+        items = self.reference_cache.get_many(lines, PARSER_VERSION)
+        missing = [i for i, item in enumerate(items) if item is None]
+        if missing:
+            parsed = self._parse_uncached_lines([lines[i] for i in missing], workers, True, field_mask)
+            self.reference_cache.put_many(
+                ((lines[i], item) for i, item in zip(missing, parsed) if item),
+                PARSER_VERSION
+            )
+            for i, item in zip(missing, parsed):
+                items[i] = item
+        if keep_empty:
+            return items
+        return [item for item in items if item]
+
+    def _parse_uncached_lines(self, lines, workers=None, keep_empty=False, field_mask=None):
+        if not workers or workers <= 1 or len(lines) < PARALLEL_MIN_LINES:
+            return _parse_reference_batch(type(self), lines, self, keep_empty, field_mask)
+
+        from concurrent.futures import ProcessPoolExecutor
+
+        batches = [lines[i:i + PARALLEL_BATCH_SIZE]
+                   for i in range(0, len(lines), PARALLEL_BATCH_SIZE)]
+        items = []
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            for batch_items in executor.map(_parse_reference_batch, repeat(type(self)), batches,
+                                            repeat(None), repeat(keep_empty),
+                                            repeat(field_mask)):
+                items.extend(batch_items)
+        return items
 
-            raw_lines = [s.strip() for s in re.split(r'\n\s*\d+\.\s*', text) if s.strip()]
-            if len(raw_lines) == 1:
-                raw_lines = [re.sub(r'^\s*\d+\.\s*', '', raw_lines[0]).strip()]
+    def read_reference_lines(self, filepath):
+        return list(self.iter_reference_lines(filepath))
 
-            if urls:
-                if len(urls) == len(raw_lines):
-                    raw_lines = [
-                        (ln if self._extract_url(ln) else f"{ln} {urls[i]}")
-                        for i, ln in enumerate(raw_lines)
-                    ]
-                else:
-                    last = raw_lines[-1]
-                    if not self._extract_url(last):
-                        raw_lines[-1] = f"{last} {urls[-1]}"
+    def iter_reference_lines(self, filepath):
+        # Строки ссылок из DOCX (через docx_reader, без python-docx) или из текстового файла
+        if str(filepath).lower().endswith('.docx'):
+            for text, urls in iter_docx_paragraphs(filepath):
+                text = text.strip()
+                if text:
+                    yield from self._split_paragraph(text, urls)
+            return
 
-            for line in raw_lines:
+        with open(filepath, 'r', encoding='utf-8') as f:
+            for line in f:
                 line = line.strip()
-                if not line:
-                    continue
-                item = self._parse_reference(line)
-                if item:
-                    items.append(item)
+                if line:
+                    yield line
 
-        return items
+    def iter_docx_references(self, filepath, field_mask=None):
+        for text, urls in iter_docx_paragraphs(filepath):
+            text = text.strip()
+            if not text:
+                continue
+            yield from self._parse_paragraph(text, urls, field_mask)
+
+    def _split_paragraph(self, text, urls):
+        raw_lines = [s.strip() for s in _NUMBERED_SPLIT_RE.split(text) if s.strip()]
+        if len(raw_lines) == 1:
+            raw_lines = [_LEADING_NUMBER_RE.sub('', raw_lines[0]).strip()]
+
+        if urls:
+            if len(urls) == len(raw_lines):
+                raw_lines = [
+                    (ln if self._extract_url(ln) else f"{ln} {urls[i]}")
+                    for i, ln in enumerate(raw_lines)
+                ]
+            else:
+                last = raw_lines[-1]
+                if not self._extract_url(last):
+                    raw_lines[-1] = f"{last} {urls[-1]}"
 
-    def _parse_reference(self, text):
+        return [line.strip() for line in raw_lines if line.strip()]
+
+    def _parse_paragraph(self, text, urls, field_mask=None):
+        return _parse_reference_batch(type(self), self._split_paragraph(text, urls), self,
+                                      field_mask=field_mask)
+
+    def _parse_reference(self, text, field_mask=None):
         text = text.strip()
         if not text:
             return None
 
-        text = re.sub(r'\s+', ' ', text)
-        text_lower = text.lower()
+        text = _WHITESPACE_RE.sub(' ', text)
+        features = REFERENCE_CLASSIFIER.scan(text.lower())
 
-        if (any(x in text_lower for x in ['vol.', 'no.', 'pp.', 'p. ', 'journal', 'trans.', 'proc.']) or
-            'doi:' in text_lower or
-            re.search(r'\d{4},\s*\d+,\s*\d+[-–]\d+', text)):
-            return self._parse_article(text)
+        if features & FEATURE_ARTICLE or ARTICLE_NUMBERS_RE.search(text):
+            return self._parse_article(text, field_mask)
 
-        if any(x in text_lower for x in ['ed.', 'edition', 'publisher', 'press', 'isbn', 'chap.']):
-            return self._parse_book(text)
+        if features & FEATURE_BOOK:
+            return self._parse_book(text, field_mask)
 
-        if any(x in text_lower for x in ['conference', 'proc.', 'proceedings', 'symposium', 'workshop']):
-            return self._parse_conference(text)
+        if features & FEATURE_CONFERENCE:
+            return self._parse_conference(text, field_mask)
 
-        if any(x in text_lower for x in ['http://', 'https://', 'www.', 'accessed', 'retrieved']):
-            return self._parse_electronic_resource(text)
+        if features & FEATURE_ELECTRONIC:
+            return self._parse_electronic_resource(text, field_mask)
 
-        return self._parse_article(text)
+        return self._parse_article(text, field_mask)
 
     def _extract_authors_and_title(self, text):
         text = text.strip()
 
-        quote_patterns = [
-            r'["\u201c](.*?)["\u201d]',
-            r'["\'](.*?)["\']',
-        ]
-
-        for pattern in quote_patterns:
-            title_match = re.search(pattern, text)
+        for pattern in _QUOTE_TITLE_PATTERNS:
+            title_match = pattern.search(text)
             if title_match:
                 title = title_match.group(1).strip()
-                title = re.sub(r'[.,;:\s]+$', '', title)
+                title = _TITLE_TRAILING_PUNCT_RE.sub('', title)
                 authors_text = text[:title_match.start()].strip()
                 authors_text = authors_text.rstrip(',')
                 rest = text[title_match.end():].strip()
@@ -150,21 +530,14 @@ class BibliographyManager:
                 return authors, title, rest
 
         if ';' in text:
-            pattern = r'^(.*?[A-Za-z]+,\s*[A-Z]\.(?:\.[A-Z])?\.)\s+(.*)$'
-            match = re.match(pattern, text)
+            match = _SEMICOLON_AUTHORS_RE.match(text)
 
             if match:
                 authors_text = match.group(1).strip()
                 rest_after_authors = match.group(2).strip()
 
-                title_patterns = [
-                    r'^(.*?)(?:\.\s+[A-Z]\.)',
-                    r'^(.*?)(?:\.\s+[A-Z][a-z])',
-                    r'^(.*?)(?:\.\s+\d{4})',
-                ]
-
-                for title_pattern in title_patterns:
-                    title_match = re.search(title_pattern, rest_after_authors)
+                for title_pattern in _SEMICOLON_TITLE_PATTERNS:
+                    title_match = title_pattern.search(rest_after_authors)
                     if title_match:
                         title = title_match.group(1).strip()
                         rest = rest_after_authors[title_match.end():].strip()
@@ -176,8 +549,7 @@ class BibliographyManager:
                 authors = self._parse_authors(authors_text)
                 return authors, title, rest
 
-        pattern = r'^(.*?\.)\s+([A-Z].*?)(?=\.\s+[A-Z]|\.\s*\d{4}|,\s*\d{4}|$)'
-        match = re.search(pattern, text, re.DOTALL)
+        match = _AUTHORS_TITLE_RE.search(text)
 
         if match:
             authors_text = match.group(1).strip()
@@ -198,16 +570,10 @@ class BibliographyManager:
         if not author_text:
             return authors
 
-        author_text = re.sub(r'\s+', ' ', author_text.strip())
+        author_text = _WHITESPACE_RE.sub(' ', author_text.strip())
 
         if ';' in author_text:
-            parts = [p.strip() for p in author_text.split(';')]
-            for part in parts:
-                if part:
-                    author = self._parse_single_author(part)
-                    if author and author.last_name:
-                        authors.append(author)
-            return authors
+            return self._author_list([p.strip() for p in author_text.split(';')])
 
         if ',' in author_text:
             parts = [p.strip() for p in author_text.split(',') if p.strip()]
@@ -218,28 +584,15 @@ class BibliographyManager:
                     return [author]
 
             if len(parts) % 2 == 0 and len(parts) > 2:
-                for i in range(0, len(parts), 2):
-                    author = self._parse_single_author(f"{parts[i]}, {parts[i+1]}")
-                    if author and author.last_name:
-                        authors.append(author)
+                authors = self._author_list([f"{parts[i]}, {parts[i+1]}" for i in range(0, len(parts), 2)])
                 if authors:
                     return authors
 
-            for part in parts:
-                if part and not re.match(r'^[A-Z]\.?$', part):
-                    author = self._parse_single_author(part)
-                    if author and author.last_name:
-                        authors.append(author)
-            return authors
+            return self._author_list([part for part in parts if not _LONE_INITIAL_RE.match(part)])
 
-        pattern = r'([A-Z]\.\s+[A-Z][a-z]+)'
-        matches = re.findall(pattern, author_text)
+        matches = _INITIAL_LAST_FINDALL_RE.findall(author_text)
         if matches:
-            for match in matches:
-                author = self._parse_single_author(match.strip())
-                if author and author.last_name:
-                    authors.append(author)
-            return authors
+            return self._author_list([match.strip() for match in matches])
 
         author = self._parse_single_author(author_text)
         if author and author.last_name:
@@ -247,102 +600,21 @@ class BibliographyManager:
 
         return authors
 
-    def _parse_single_author(self, author_str):
-        if not author_str:
-            return None
-
-        author_str = author_str.strip().rstrip(',')
-
-        hyphen_match = re.search(r'([A-Z])\.-([A-Z])\.', author_str)
-        if hyphen_match:
-            if ',' in author_str:
-                parts = [p.strip() for p in author_str.split(',', 1)]
-                if len(parts) == 2:
-                    last_name = parts[0]
-                    hyphen_initials = re.search(r'([A-Z])\.-([A-Z])\.', parts[1])
-                    if hyphen_initials:
-                        return Author(last_name=last_name,
-                                     first_name=f"{hyphen_initials.group(1)}-{hyphen_initials.group(2)}")
-
-            match = re.match(r'^([A-Z])\.-([A-Z])\.\s+([A-Z][a-z]+(?:\s+[A-Z][a-z]+)*)$', author_str)
-            if match:
-                return Author(last_name=match.group(3),
-                             first_name=f"{match.group(1)}-{match.group(2)}")
-
-        if ',' in author_str:
-            parts = [p.strip() for p in author_str.split(',', 1)]
-            if len(parts) == 2:
-                last_name = parts[0]
-                initials = parts[1]
-                initials_clean = re.sub(r'[.\s]', '', initials)
-
-                if '-' in initials_clean:
-                    return Author(last_name=last_name, first_name=initials_clean)
-
-                if '.' in initials and len(initials_clean) >= 2:
-                    if len(initials_clean) == 2:
-                        return Author(last_name=last_name,
-                                     first_name=initials_clean[0],
-                                     middle_name=initials_clean[1])
-                    elif len(initials_clean) > 2:
-                        if len(initials_clean) <= 4 and all(c.isupper() for c in initials_clean):
-                            return Author(last_name=last_name,
-                                         first_name=initials_clean[0],
-                                         middle_name=initials_clean[-1])
-                        else:
-                            return Author(last_name=last_name, first_name=initials_clean)
-
-                if len(initials_clean) >= 2:
-                    return Author(last_name=last_name,
-                                 first_name=initials_clean[0],
-                                 middle_name=initials_clean[1])
-                elif len(initials_clean) == 1:
-                    return Author(last_name=last_name,
-                                 first_name=initials_clean[0])
-
-                return Author(last_name=last_name)
-
-        match = re.match(r'^([A-Z])\.?\s+([A-Z][a-z]+(?:\s+[A-Z][a-z]+)*)$', author_str)
-        if match:
-            return Author(last_name=match.group(2),
-                         first_name=match.group(1))
-
-        match = re.match(r'^([A-Z])\.-([A-Z])\.\s+([A-Z][a-z]+)$', author_str)
-        if match:
-            return Author(last_name=match.group(3),
-                         first_name=f"{match.group(1)}-{match.group(2)}")
+    def _author_list(self, entries):
+        # Длинные списки коллабораций хранятся компактно: хвост разбирается по требованию
+        head = self.AUTHOR_LIST_HEAD
+        if head is not None and len(entries) > head:
+            return AuthorList(_parse_author_entries(entries[:head]), entries[head:], _parse_author_entry)
+        return _parse_author_entries(entries)
 
-        match = re.match(r'^([A-Z])\.\s*([A-Z])\.?\s+([A-Z][a-z]+)$', author_str)
-        if match:
-            return Author(last_name=match.group(3),
-                         first_name=match.group(1),
-                         middle_name=match.group(2))
-
-        match = re.match(r'^([A-Z][a-z]+)\s+([A-Z])\.?\s*([A-Z])?\.?$', author_str)
-        if match:
-            return Author(last_name=match.group(1),
-                         first_name=match.group(2),
-                         middle_name=match.group(3) if match.group(3) else "")
-
-        match = re.match(r'^([A-Z][a-z]+)\s+([A-Z])\.-([A-Z])\.$', author_str)
-        if match:
-            return Author(last_name=match.group(1),
-                         first_name=f"{match.group(2)}-{match.group(3)}")
-
-        if re.match(r'^[A-Z][a-z]+$', author_str):
-            return Author(last_name=author_str)
-
-        return None
+    def _parse_single_author(self, author_str):
+        return _parse_author_entry(author_str)
 
     def _extract_url(self, text):
         if not text:
             return ""
 
-        candidates = re.findall(
-            r'(https?://[^\s<>"\']+|www\.[^\s<>"\']+)',
-            text,
-            flags=re.IGNORECASE
-        )
+        candidates = _URL_RE.findall(text)
         if not candidates:
             return ""
 
@@ -357,35 +629,89 @@ class BibliographyManager:
     def _strip_urls(self, text):
         if not text:
             return ""
-        text = re.sub(r'(https?://[^\s<>"\']+|www\.[^\s<>"\']+)', ' ', text, flags=re.IGNORECASE)
-        text = re.sub(r'\s+', ' ', text).strip()
+        text = _URL_RE.sub(' ', text)
+        text = _WHITESPACE_RE.sub(' ', text).strip()
         return text
 
     def _strip_doi_from_text(self, text, doi=""):
         if not text:
             return ""
-        text = re.sub(r'\bdoi\b\s*[:]?\s*10\.[^\s,;]+', ' ', text, flags=re.IGNORECASE)
+        text = _DOI_WITH_PREFIX_RE.sub(' ', text)
         if doi:
-            d = re.escape(doi)
-            text = re.sub(rf'(?:\bdoi\b\s*[:]?\s*)?{d}', ' ', text, flags=re.IGNORECASE)
-        text = re.sub(r'\s+', ' ', text).strip()
+            text = self._remove_doi_occurrences(text, doi)
+        text = _WHITESPACE_RE.sub(' ', text).strip()
         return text
 
+    def _remove_doi_occurrences(self, text, doi):
+        lowered = text.lower()
+        if len(lowered) != len(text):
+            lowered = ''.join(c if len(c.lower()) != 1 else c.lower() for c in text)
+        needle = doi.lower()
+        if len(needle) != len(doi):
+            needle = ''.join(c if len(c.lower()) != 1 else c.lower() for c in doi)
+
+        out = []
+        pos = 0
+        idx = lowered.find(needle)
+        while idx != -1:
+            start, end = idx, idx + len(needle)
+            k = self._skip_doi_label(text, lowered, idx, forward=True)
+            if k is not None and lowered.startswith(needle, k):
+                end = k + len(needle)
+            else:
+                j = self._skip_doi_label(text, lowered, idx, forward=False, limit=pos)
+                if j is not None:
+                    start = j
+            out.append(text[pos:start])
+            out.append(' ')
+            pos = end
+            idx = lowered.find(needle, pos)
+        out.append(text[pos:])
+        return ''.join(out)
+
+    def _skip_doi_label(self, text, lowered, idx, forward, limit=0):
+        if forward:
+            if lowered[idx:idx + 3] != 'doi' or (idx > 0 and _is_word_char(text[idx - 1])):
+                return None
+            k = idx + 3
+            if k < len(text) and _is_word_char(text[k]):
+                return None
+            while k < len(text) and text[k].isspace():
+                k += 1
+            if k < len(text) and text[k] == ':':
+                k += 1
+            while k < len(text) and text[k].isspace():
+                k += 1
+            return k
+
+        j = idx
+        while j > limit and text[j - 1].isspace():
+            j -= 1
+        if j > limit and text[j - 1] == ':':
+            j -= 1
+            while j > limit and text[j - 1].isspace():
+                j -= 1
+        if (j - 3 >= limit and lowered[j - 3:j] == 'doi'
+                and (j - 3 == 0 or not _is_word_char(text[j - 4]))
+                and (j == len(text) or not _is_word_char(text[j]))):
+            return j - 3
+        return None
+
     def _extract_doi(self, text):
         if not text:
             return ""
 
-        m = re.search(r'\bdoi\b\s*[:]?\s*([^\s,;]+)', text, re.IGNORECASE)
+        m = _DOI_RE.search(text)
         if m:
             return self._clean_extracted_value(m.group(1), field_name="doi")
 
-        m = re.search(r'https?://doi\.org/([^\s,;]+)', text, re.IGNORECASE)
+        m = _DOI_ORG_RE.search(text)
         if m:
             return self._clean_extracted_value(m.group(1), field_name="doi")
 
         try:
             from urllib.parse import urlparse, parse_qs, unquote
-            for u in re.findall(r'(https?://[^\s<>"\']+|www\.[^\s<>"\']+)', text, flags=re.IGNORECASE):
+            for u in _URL_RE.findall(text):
                 if u.lower().startswith('www.'):
                     u = 'https://' + u
                 qs = parse_qs(urlparse(u).query)
@@ -399,14 +725,8 @@ class BibliographyManager:
     def _extract_accessed_date(self, text):
         if not text:
             return ""
-        patterns = [
-            r'\b(?:accessed|retrieved)\b\s*(?:on\s*)?([A-Za-z]+\s+\d{1,2},\s*\d{4})',
-            r'\b(?:accessed|retrieved)\b\s*(?:on\s*)?(\d{4}-\d{2}-\d{2})',
-            r'\b(?:accessed|retrieved)\b\s*(?:on\s*)?(\d{1,2}\.\d{1,2}\.\d{4})',
-            r'\[\s*(?:accessed|retrieved)\s*[:]?\s*([^\]]+)\]',
-        ]
-        for p in patterns:
-            m = re.search(p, text, re.IGNORECASE)
+        for p in _ACCESSED_DATE_PATTERNS:
+            m = p.search(text)
             if m:
                 return self._clean_extracted_value(m.group(1), field_name="accessed_date")
         return ""
@@ -414,10 +734,10 @@ class BibliographyManager:
     def _extract_publisher(self, text):
         if not text:
             return ""
-        m = re.search(r'\bpublisher\s*[:]?\s*([^.,;]+)', text, re.IGNORECASE)
+        m = _PUBLISHER_LABEL_RE.search(text)
         if m:
             return self._clean_extracted_value(m.group(1), field_name="publisher")
-        m = re.search(r'([A-Z][a-z]+(?:\s+[A-Z][a-z]+)*)\s*:\s*([^.,;]+)', text)
+        m = _CITY_PUBLISHER_RE.search(text)
         if m:
             return self._clean_extracted_value(m.group(2), field_name="publisher")
         return ""
@@ -425,7 +745,7 @@ class BibliographyManager:
     def _extract_city_and_publisher(self, text):
         if not text:
             return "", ""
-        m = re.search(r'([A-Z][a-z]+(?:\s+[A-Z][a-z]+)*)\s*:\s*([^.,;]+)', text)
+        m = _CITY_PUBLISHER_RE.search(text)
         if m:
             return m.group(1).strip(), m.group(2).strip()
         return "", self._extract_publisher(text)
@@ -433,20 +753,14 @@ class BibliographyManager:
     def _extract_isbn(self, text):
         if not text:
             return ""
-        m = re.search(r'\bISBN\b\s*[:]?\s*([0-9Xx\-]+)', text)
+        m = _ISBN_RE.search(text)
         return self._clean_extracted_value(m.group(1), field_name="isbn") if m else ""
 
     def _extract_edition(self, text):
         if not text:
             return ""
-        patterns = [
-            r'\b(\d+(?:st|nd|rd|th)\s+ed\.?)(?!\w)',
-            r'\b(\d+\s*ed(?:ition)?\.?)(?!\w)',
-            r'\b(ed\.?\s*\d+)\b',
-            r'\b(rev\.?\s*ed\.?)\b',
-        ]
-        for p in patterns:
-            m = re.search(p, text, re.IGNORECASE)
+        for p in _EDITION_PATTERNS:
+            m = p.search(text)
             if m:
                 return self._clean_extracted_value(m.group(1), field_name="edition")
         return ""
@@ -454,174 +768,173 @@ class BibliographyManager:
     def _extract_website(self, text, url=""):
         if not text:
             return ""
-        m = re.search(r"\b(?:on|at)\s+([^.,;]+)\s*(?:website|site)\b", text, re.IGNORECASE)
+        m = _WEBSITE_RE.search(text)
         if m:
             return self._clean_extracted_value(m.group(1), field_name="website")
         return ""
 
-    def _parse_article(self, text):
-        item = Article()
-
-        authors, title, rest = self._extract_authors_and_title(text)
-        item.authors = authors
-        item.title = title
-
-        item.url = self._clean_extracted_value(self._extract_url(text) or self._extract_url(rest), field_name="url")
-        item.doi = self._clean_extracted_value(self._extract_doi(text) or self._extract_doi(rest), field_name="doi")
-        item.accessed_date = self._clean_extracted_value(self._extract_accessed_date(text) or self._extract_accessed_date(rest), field_name="accessed_date")
-
-        rest = self._strip_urls(rest)
-        rest = self._strip_doi_from_text(rest, item.doi)
+    def _link_extractors(self, text, rest):
+        return {
+            'url': lambda: self._clean_extracted_value(self._extract_url(text) or self._extract_url(rest), field_name="url"),
+            'doi': _once(lambda: self._clean_extracted_value(self._extract_doi(text) or self._extract_doi(rest), field_name="doi")),
+            'accessed_date': lambda: self._clean_extracted_value(self._extract_accessed_date(text) or self._extract_accessed_date(rest), field_name="accessed_date"),
+        }
+
+    def _assign_fields(self, item, kind, text, rest, field_mask=None):
+        # Поля, не нужные текущему стилю, извлекаются при первом обращении.
+        # Вместе с замыканиями запись хранит, как их восстановить после pickle
+        extractors = getattr(self, kind)(text, rest)
+        deferred = False
+        for name, extractor in extractors.items():
+            if field_mask is None or name in field_mask:
+                setattr(item, name, extractor())
+            else:
+                item.defer_field(name, extractor)
+                deferred = True
+        if deferred:
+            item.set_deferred_source(partial(_field_extractors, type(self), kind, text, rest))
+        return item
 
-        year_match = re.search(r'\b(19|20)\d{2}\b', rest)
+    def _extract_year(self, text):
+        year_match = _YEAR_RE.search(text)
         if year_match:
-            item.year = int(year_match.group())
-
-        journal_patterns = [
-            r'(IEEE\s+Trans\.\s+on\s+[^.,]+)',
-            r'(IEEE\s+Trans\.\s+[^.,]+)',
-            r'\.\s*([A-Z][^.,]*(?:\s+[A-Z][^.,]*)*)(?=\s*[,\\.])',
-        ]
+            return int(year_match.group())
+        return 0
 
-        for pattern in journal_patterns:
-            match = re.search(pattern, rest)
+    def _extract_journal(self, text):
+        for pattern in _JOURNAL_PATTERNS:
+            match = pattern.search(text)
             if match:
                 journal = match.group(1).strip()
                 if len(journal) > 3 and not journal.isdigit():
-                    item.journal = self._clean_extracted_value(journal, field_name="journal")
-                    break
-
-        if not item.journal:
-            parts = [p.strip() for p in rest.split('.')]
-            for part in parts:
-                if (len(part) > 3 and re.match(r'^[A-Z]', part) and
-                    not re.search(r'\b(vol|no|pp|p|doi|http)\b', part, re.I) and
-                    not re.search(r'\d{4}', part)):
-                    item.journal = self._clean_extracted_value(part, field_name="journal")
-                    break
-
-        vol_patterns = [
-            r'\b[Vv]olume\b\s*[:]?\s*(\d+|[IVXLCDM]+)',
-            r'[Vv]ol\.?\s*[:]?\s*(\d+|[IVXLCDM]+)',
-            r',\s*(\d+)\s*,',
-            r'\.\s*(\d+)\s*,',
-        ]
-        for pattern in vol_patterns:
-            vol_match = re.search(pattern, rest)
-            if vol_match:
-                item.volume = self._clean_extracted_value(vol_match.group(1), field_name="volume")
+                    return self._clean_extracted_value(journal, field_name="journal")
                 break
 
-        issue_patterns = [
-            r'\b(?:no\.|no|issue)\b\s*[:]?\s*(\d+)\b',
-            r'\b\d+\s*\(\s*(\d+)\s*\)\b',
-        ]
-        for pattern in issue_patterns:
-            issue_match = re.search(pattern, rest)
+        parts = [p.strip() for p in text.split('.')]
+        for part in parts:
+            if (len(part) > 3 and _CAPITALIZED_START_RE.match(part) and
+                not _JOURNAL_EXCLUDED_WORDS_RE.search(part) and
+                not _FOUR_DIGITS_RE.search(part)):
+                return self._clean_extracted_value(part, field_name="journal")
+        return ""
+
+    def _extract_volume(self, text):
+        for pattern in _VOLUME_PATTERNS:
+            vol_match = pattern.search(text)
+            if vol_match:
+                return self._clean_extracted_value(vol_match.group(1), field_name="volume")
+        return ""
+
+    def _extract_issue(self, text):
+        for pattern in _ISSUE_PATTERNS:
+            issue_match = pattern.search(text)
             if issue_match:
-                item.issue = self._clean_extracted_value(issue_match.group(1), field_name="issue")
-                break
+                return self._clean_extracted_value(issue_match.group(1), field_name="issue")
+        return ""
 
-        pages_patterns = [
-            r'[Pp]p?\.?\s*[:]?\s*(\d+[-–]\d+)',
-            r'\b(\d+)\s*[-–]\s*(\d+)\b',
-            r',\s*(\d+[-–]\d+)\s*\.',
-            r',\s*(\d+[-–]\d+)\s*,',
-        ]
-        for pattern in pages_patterns:
-            pages_match = re.search(pattern, rest)
+    def _extract_pages(self, text):
+        for pattern in _PAGES_PATTERNS:
+            pages_match = pattern.search(text)
             if pages_match:
                 if len(pages_match.groups()) == 2:
-                    item.pages = self._clean_extracted_value(f"{pages_match.group(1)}-{pages_match.group(2)}", field_name="pages")
-                else:
-                    item.pages = self._clean_extracted_value(pages_match.group(1), field_name="pages")
-                break
+                    return self._clean_extracted_value(f"{pages_match.group(1)}-{pages_match.group(2)}", field_name="pages")
+                return self._clean_extracted_value(pages_match.group(1), field_name="pages")
+        return ""
 
-        pub = self._extract_publisher(rest) or self._extract_publisher(text)
-        if pub:
-            item.publisher = self._clean_extracted_value(pub, field_name="publisher")
+    def _extract_conference_name(self, text):
+        conf_match = _CONFERENCE_NAME_RE.search(text)
+        if conf_match:
+            return self._clean_extracted_value(conf_match.group(1).strip(), field_name="conference_name")
+        return ""
 
-        return item
+    def _extract_location(self, text):
+        location = ""
+        loc_match = _PARENTHESIZED_RE.search(text)
+        if loc_match and not _DIGIT_RE.search(loc_match.group(1)):
+            location = self._clean_extracted_value(loc_match.group(1).strip(), field_name="location")
+        if not location:
+            loc_match = _LOCATION_RE.search(text)
+            if loc_match:
+                location = self._clean_extracted_value(loc_match.group(1).strip(), field_name="location")
+        return location
 
-    def _parse_book(self, text):
-        item = Book()
+    def _extract_conference_publisher(self, text):
+        pub_match = _CONFERENCE_PUBLISHER_RE.search(text)
+        if pub_match:
+            return self._clean_extracted_value(pub_match.group(1), field_name="publisher")
+        return ""
+
+    def _parse_article(self, text, field_mask=None):
+        item = Article()
 
         authors, title, rest = self._extract_authors_and_title(text)
         item.authors = authors
         item.title = title
+        return self._assign_fields(item, '_article_extractors', text, rest, field_mask)
+
+    def _article_extractors(self, text, rest):
+        extractors = self._link_extractors(text, rest)
+        doi = extractors['doi']
+        body = _once(lambda: self._strip_doi_from_text(self._strip_urls(rest), doi()))
+
+        extractors.update({
+            'year': lambda: self._extract_year(body()),
+            'journal': lambda: self._extract_journal(body()),
+            'volume': lambda: self._extract_volume(body()),
+            'issue': lambda: self._extract_issue(body()),
+            'pages': lambda: self._extract_pages(body()),
+            'publisher': lambda: self._clean_extracted_value(
+                self._extract_publisher(body()) or self._extract_publisher(text), field_name="publisher"),
+        })
+        return extractors
+
+    def _parse_book(self, text, field_mask=None):
+        item = Book()
 
-        item.url = self._clean_extracted_value(self._extract_url(text) or self._extract_url(rest), field_name="url")
-        item.doi = self._clean_extracted_value(self._extract_doi(text) or self._extract_doi(rest), field_name="doi")
-        item.accessed_date = self._clean_extracted_value(self._extract_accessed_date(text) or self._extract_accessed_date(rest), field_name="accessed_date")
-
-        year_match = re.search(r'\b(19|20)\d{2}\b', rest)
-        if year_match:
-            item.year = int(year_match.group())
-
-        city, publisher = self._extract_city_and_publisher(rest)
-        if city and not item.city:
-            item.city = self._clean_extracted_value(city, field_name="city")
-        if publisher and not item.publisher:
-            item.publisher = self._clean_extracted_value(publisher, field_name="publisher")
-
-        if not item.publisher:
-            item.publisher = self._clean_extracted_value(self._extract_publisher(rest), field_name="publisher")
-
-        item.edition = self._clean_extracted_value(self._extract_edition(rest), field_name="edition")
-
-        item.isbn = self._clean_extracted_value(self._extract_isbn(rest), field_name="isbn")
-
-        return item
-
-    def _parse_conference(self, text):
+        authors, title, rest = self._extract_authors_and_title(text)
+        item.authors = authors
+        item.title = title
+        return self._assign_fields(item, '_book_extractors', text, rest, field_mask)
+
+    def _book_extractors(self, text, rest):
+        city_and_publisher = _once(lambda: self._extract_city_and_publisher(rest))
+
+        def publisher():
+            value = self._clean_extracted_value(city_and_publisher()[1], field_name="publisher")
+            if not value:
+                value = self._clean_extracted_value(self._extract_publisher(rest), field_name="publisher")
+            return value
+
+        extractors = self._link_extractors(text, rest)
+        extractors.update({
+            'year': lambda: self._extract_year(rest),
+            'city': lambda: self._clean_extracted_value(city_and_publisher()[0], field_name="city"),
+            'publisher': publisher,
+            'edition': lambda: self._clean_extracted_value(self._extract_edition(rest), field_name="edition"),
+            'isbn': lambda: self._clean_extracted_value(self._extract_isbn(rest), field_name="isbn"),
+        })
+        return extractors
+
+    def _parse_conference(self, text, field_mask=None):
         item = ConferencePaper()
 
         authors, title, rest = self._extract_authors_and_title(text)
         item.authors = authors
         item.title = title
-
-        item.url = self._clean_extracted_value(self._extract_url(text) or self._extract_url(rest), field_name="url")
-        item.doi = self._clean_extracted_value(self._extract_doi(text) or self._extract_doi(rest), field_name="doi")
-        item.accessed_date = self._clean_extracted_value(self._extract_accessed_date(text) or self._extract_accessed_date(rest), field_name="accessed_date")
-
-        year_match = re.search(r'\b(19|20)\d{2}\b', rest)
-        if year_match:
-            item.year = int(year_match.group())
-
-        conf_match = re.search(r'\b[Ii]n\s*:?\s*([^.,]+)', rest)
-        if conf_match:
-            item.conference_name = self._clean_extracted_value(conf_match.group(1).strip(), field_name="conference_name")
-
-        pages_patterns = [
-            r'[Pp]p?\.?\s*[:]?\s*(\d+[-–]\d+)',
-            r'\b(\d+)\s*[-–]\s*(\d+)\b',
-            r',\s*(\d+[-–]\d+)\s*\.',
-            r',\s*(\d+[-–]\d+)\s*,',
-        ]
-        for pattern in pages_patterns:
-            m = re.search(pattern, rest)
-            if m:
-                if len(m.groups()) == 2:
-                    item.pages = self._clean_extracted_value(f"{m.group(1)}-{m.group(2)}", field_name="pages")
-                else:
-                    item.pages = self._clean_extracted_value(m.group(1), field_name="pages")
-                break
-
-        loc_match = re.search(r'\(([^\)]+)\)', rest)
-        if loc_match and not re.search(r'\d', loc_match.group(1)):
-            item.location = self._clean_extracted_value(loc_match.group(1).strip(), field_name="location")
-        if not item.location:
-            loc_match = re.search(r',\s*([A-Z][a-z]+(?:\s+[A-Z][a-z]+)*?(?:,\s*[A-Z][a-z]+)?)\s*[\.,]', rest)
-            if loc_match:
-                item.location = self._clean_extracted_value(loc_match.group(1).strip(), field_name="location")
-
-        pub_match = re.search(r'\b(IEEE|ACM|Springer|Elsevier)\b', rest)
-        if pub_match:
-            item.publisher = self._clean_extracted_value(pub_match.group(1), field_name="publisher")
-
-        return item
-
-    def _parse_electronic_resource(self, text):
+        return self._assign_fields(item, '_conference_extractors', text, rest, field_mask)
+
+    def _conference_extractors(self, text, rest):
+        extractors = self._link_extractors(text, rest)
+        extractors.update({
+            'year': lambda: self._extract_year(rest),
+            'conference_name': lambda: self._extract_conference_name(rest),
+            'pages': lambda: self._extract_pages(rest),
+            'location': lambda: self._extract_location(rest),
+            'publisher': lambda: self._extract_conference_publisher(rest),
+        })
+        return extractors
+
+    def _parse_electronic_resource(self, text, field_mask=None):
         item = ElectronicResource()
 
         authors, title, rest = self._extract_authors_and_title(text)
@@ -638,70 +951,193 @@ class BibliographyManager:
                 if not item.title:
                     item.title = potential_title
 
-        item.url = self._clean_extracted_value(self._extract_url(text) or self._extract_url(rest), field_name="url")
-        item.doi = self._clean_extracted_value(self._extract_doi(text) or self._extract_doi(rest), field_name="doi")
-        item.accessed_date = self._clean_extracted_value(self._extract_accessed_date(text) or self._extract_accessed_date(rest), field_name="accessed_date")
-
-        year_match = re.search(r'\b(19|20)\d{2}\b', text)
-        if year_match:
-            item.year = int(year_match.group())
+        return self._assign_fields(item, '_electronic_extractors', text, rest, field_mask)
 
-        item.website = self._clean_extracted_value(self._extract_website(text, item.url), field_name="website")
+    def _electronic_extractors(self, text, rest):
+        extractors = self._link_extractors(text, rest)
+        url = extractors['url'] = _once(extractors['url'])
+        extractors.update({
+            'year': lambda: self._extract_year(text),
+            'website': lambda: self._clean_extracted_value(self._extract_website(text, url()), field_name="website"),
+            'publisher': lambda: self._clean_extracted_value(self._extract_publisher(text), field_name="publisher"),
+        })
+        return extractors
 
-        pub = self._extract_publisher(text)
-        if pub:
-            item.publisher = self._clean_extracted_value(pub, field_name="publisher")
+    def format_all_items(self):
+        if not self.current_style:
+            raise ValueError("Стиль не установлен")
 
-        return item
+        return self._format_items(self.items)
 
-    def format_all_items(self):
+    def format_and_validate_all_items(self):
+        # Один проход: отформатированная строка и список недостающих полей для каждой записи
         if not self.current_style:
             raise ValueError("Стиль не установлен")
 
-        return [self.current_style.format_item(item) for item in self.items]
+        return self._format_items(self.items, validate=True)
+
+    def _format_items(self, items, validate=False):
+        # Кэш: запись -> [версия записи, отпечаток стиля, строка, сегменты полей, недостающие поля,
+        # XML абзаца без номера по значению highlight_missing]. Сегменты - нормализованные значения
+        # полей записи; от стиля из них зависит только authors_str, остальные переживают смену стиля
+        style = self.current_style
+        fingerprint = style.fingerprint()
+        previous_fingerprint, changed_fields, changed_classes = None, None, {}
+        required_changed = authors_changed = False
+        if self._format_state is not None and self._format_state[0] != fingerprint:
+            previous_style = self._format_state[1]
+            previous_fingerprint = self._format_state[0]
+            changed_fields, _ = previous_style.diff(style)
+            required_changed = previous_style.required_fields != style.required_fields
+            authors_changed = (previous_style.author_format_config.to_dict()
+                               != style.author_format_config.to_dict())
+        cache = self._format_cache
+        plan = None
+        results = []
+        for item in items:
+            version = item.version
+            cached = cache.get(item)
+            if cached is not None and cached[0] == version:
+                reuse = cached[1] == fingerprint
+                if not reuse:
+                    item_cls = type(item)
+                    segments = cached[3]
+                    if cached[1] == previous_fingerprint:
+                        affected = changed_classes.get(item_cls)
+                        if affected is None:
+                            affected = changed_classes[item_cls] = bool(changed_fields & set(item_cls.FIELDS))
+                        if not affected:
+                            cached[1] = fingerprint
+                            if required_changed:
+                                cached[4] = None
+                                cached[5] = {}
+                            reuse = True
+                        elif authors_changed:
+                            segments.pop('authors_str', None)
+                    else:
+                        # Прежний стиль неизвестен: формат авторов мог измениться
+                        segments.pop('authors_str', None)
+                if reuse:
+                    if validate and cached[4] is None:
+                        if plan is None:
+                            plan = self._compiled_plan(fingerprint)
+                        cached[4] = plan.missing_fields(item, cached[3])
+                    results.append((cached[2], cached[4]) if validate else cached[2])
+                    continue
+            else:
+                segments = {}
+            if plan is None:
+                plan = self._compiled_plan(fingerprint)
+            if validate:
+                formatted, missing = plan.format_and_validate(item, segments)
+            else:
+                formatted, missing = plan.format_item(item, segments), None
+            cache[item] = [version, fingerprint, formatted, segments, missing, {}]
+            results.append((formatted, missing) if validate else formatted)
+        if self._format_state is None or self._format_state[0] != fingerprint:
+            self._format_state = (fingerprint, style.copy())
+        return results
+
+    def clear_format_cache(self):
+        # Следующее форматирование пойдет с нуля, например для честного замера
+        self._format_cache.clear()
+        self._format_state = None
+        self._style_plan = None
+
+    def _compiled_plan(self, fingerprint):
+        # План пересобирается только при изменении стиля, например между файлами пакетной обработки
+        if self._style_plan is None or self._style_plan[0] != fingerprint:
+            self._style_plan = (fingerprint, self.current_style.compile())
+        return self._style_plan[1]
 
     def validate_all_items(self):
         if not self.current_style:
             raise ValueError("Стиль не установлен")
 
+        plan = self._compiled_plan(self.current_style.fingerprint())
         results = []
         for item in self.items:
-            is_valid, missing = self.current_style.validate_item(item)
-            results.append((item, is_valid, missing))
+            missing = plan.missing_fields(item)
+            results.append((item, not missing, missing))
 
         return results
 
-    def save_to_docx(self, filepath, highlight_missing=True):
-        doc = Document()
-        doc.add_heading('Список литературы', 0)
-
+    def save_to_docx(self, filepath, highlight_missing=True, workers=None):
         if not self.current_style:
+            doc = _docx_document()()
+            doc.add_heading('Список литературы', 0)
             doc.add_paragraph("Стиль не установлен")
             doc.save(filepath)
             return
 
-        validation_results = []
-        if highlight_missing:
-            validation_results = self.validate_all_items()
-
-        for i, item in enumerate(self.items, 1):
-            formatted = self.current_style.format_item(item)
-            para = doc.add_paragraph()
-
-            run = para.add_run(f"{i}. ")
-            run.bold = True
+        if workers and workers > 1 and len(self.items) >= PARALLEL_MIN_LINES:
+            self._save_to_docx_parallel(filepath, highlight_missing, workers)
+            return
 
-            para.add_run(formatted)
+        self._write_entries(filepath, self._entry_bodies(highlight_missing))
 
-            if highlight_missing and validation_results:
-                _, is_valid, missing = validation_results[i-1]
-                if not is_valid and missing:
-                    warning = f" [Отсутствуют: {', '.join(missing)}]"
-                    run = para.add_run(warning)
-                    run.font.color.rgb = RGBColor(255, 0, 0)
-                    run.italic = True
+    def _entry_bodies(self, highlight_missing):
+        # XML абзацев берется из кэша форматирования, отрисовываются только новые и измененные записи
+        if highlight_missing:
+            results = self.format_and_validate_all_items()
+        else:
+            results = [(formatted, None) for formatted in self.format_all_items()]
+        cache = self._format_cache
+        bodies = []
+        for item, (formatted, missing) in zip(self.items, results):
+            rendered = cache[item][5]
+            body = rendered.get(highlight_missing)
+            if body is None:
+                body = rendered[highlight_missing] = render_entry_body(formatted, missing).encode('utf-8')
+            bodies.append(body)
+        return bodies
+
+    def _write_entries(self, filepath, bodies):
+        paragraphs = (render_number(i).encode('utf-8') + body for i, body in enumerate(bodies, 1))
+        write_docx(filepath, 'Список литературы', paragraphs)
+
+    def _save_to_docx_parallel(self, filepath, highlight_missing, workers):
+        # Процессы отрисовывают только записи, которых нет в кэше; родитель добавляет номера
+        # и склеивает абзацы по порядку
+        style = self.current_style
+        fingerprint = style.fingerprint()
+        cache = self._format_cache
+        bodies = [None] * len(self.items)
+        misses = []
+        for i, item in enumerate(self.items):
+            cached = cache.get(item)
+            if (cached is not None and cached[0] == item.version and cached[1] == fingerprint
+                    and (cached[4] is not None or not highlight_missing)):
+                rendered = cached[5]
+                body = rendered.get(highlight_missing)
+                if body is None:
+                    missing = cached[4] if highlight_missing else None
+                    body = rendered[highlight_missing] = render_entry_body(cached[2], missing).encode('utf-8')
+                bodies[i] = body
+            else:
+                misses.append(i)
+
+        if len(misses) < PARALLEL_MIN_LINES:
+            # Немногие промахи дешевле досчитать здесь, заодно с частичным переиспользованием кэша
+            self._write_entries(filepath, self._entry_bodies(highlight_missing))
+            return
 
-        doc.save(filepath)
+        from concurrent.futures import ProcessPoolExecutor
+
+        style_json = json.dumps(style.to_dict(), ensure_ascii=False)
+        batches = [misses[i:i + PARALLEL_BATCH_SIZE] for i in range(0, len(misses), PARALLEL_BATCH_SIZE)]
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            rendered_batches = executor.map(_render_entry_batch, repeat(style_json),
+                                            [[self.items[i] for i in batch] for batch in batches],
+                                            repeat(highlight_missing))
+            for batch, entries in zip(batches, rendered_batches):
+                for i, (text, missing, body) in zip(batch, entries):
+                    item = self.items[i]
+                    cache[item] = [item.version, fingerprint, text, {}, missing, {highlight_missing: body}]
+                    bodies[i] = body
+        if self._format_state is None or self._format_state[0] != fingerprint:
+            self._format_state = (fingerprint, style.copy())
+        self._write_entries(filepath, bodies)
 
     def create_custom_style(self, field_order, required_fields,
                           author_config=None):
@@ -1,7 +1,121 @@
-import re
+import json
+import hashlib
+from operator import attrgetter
 from typing import List, Dict, Tuple, Any
 from author_formatter import AuthorFormatter, AuthorFormatConfig
 from author import AuthorFormat
+from bibliography import ResourceType, BibliographicItem, ITEM_CLASSES
+from version import OUTPUT_VERSION
+
+FIELD_PREFIXES = {
+    'volume': 'vol.',
+    'issue': 'no.',
+    'pages': 'pp.',
+    'doi': 'doi:',
+    'url': 'URL:'
+}
+
+_PUNCTUATION = '.,;:'
+
+
+def _space_quoted_years(text):
+    # '",2020' -> '", 2020' и '".2020' -> '". 2020'
+    if '",' not in text and '".' not in text:
+        return text
+    parts = []
+    start = 0
+    i = text.find('"')
+    while i != -1:
+        if text[i + 1:i + 2] in (',', '.'):
+            digits = text[i + 2:i + 6]
+            if len(digits) == 4 and digits.isdecimal():
+                parts.append(text[start:i + 2])
+                parts.append(' ')
+                start = i + 2
+        i = text.find('"', i + 1)
+    parts.append(text[start:])
+    return ''.join(parts)
+
+
+def _normalize_fragment(text):
+    # Пробелы внутри фрагмента схлопываются и убираются перед знаками препинания;
+    # по краям остается не больше одного пробела, его судьбу решает склейка
+    if (text.isprintable() and '  ' not in text and ' .' not in text and ' ,' not in text
+            and ' ;' not in text and ' :' not in text and '",' not in text and '".' not in text):
+        return text
+
+    words = text.split()
+    if not words:
+        return ' ' if text else ''
+
+    parts = []
+    if text[0].isspace() and words[0][0] not in _PUNCTUATION:
+        parts.append(' ')
+    parts.append(words[0])
+    for word in words[1:]:
+        if word[0] not in _PUNCTUATION:
+            parts.append(' ')
+        parts.append(word)
+    if text[-1].isspace():
+        parts.append(' ')
+    return _space_quoted_years(''.join(parts))
+
+
+def _join_fragments(fragments):
+    # Склейка нормализованных фрагментов: на стыке решается, остается ли пробел
+    # и нужен ли пробел между кавычкой с запятой/точкой и годом
+    out = []
+    tail = ''
+    for piece in fragments:
+        if not piece:
+            continue
+
+        if tail.endswith(' '):
+            if piece[0] == ' ':
+                piece = piece[1:]
+                if not piece:
+                    continue
+            if piece[0] in _PUNCTUATION:
+                out[-1] = out[-1][:-1]
+                if not out[-1]:
+                    out.pop()
+                tail = tail[:-1]
+
+        if '"' in tail:
+            window = tail + piece[:5]
+            i = window.find('"')
+            while i != -1 and i < len(tail):
+                if i + 6 > len(tail) and window[i + 1:i + 2] in (',', '.'):
+                    digits = window[i + 2:i + 6]
+                    if len(digits) == 4 and digits.isdecimal():
+                        split = i + 2 - len(tail)
+                        if split >= 0:
+                            piece = piece[:split] + ' ' + piece[split:]
+                        else:
+                            emitted = ''.join(out)
+                            emitted = emitted[:split] + ' ' + emitted[split:]
+                            out = [emitted]
+                            tail = emitted[-6:]
+                        break
+                i = window.find('"', i + 1)
+
+        out.append(piece)
+        tail = (tail + piece)[-6:]
+    return ''.join(out)
+
+
+def _finish_text(text):
+    if text.endswith(' .'):
+        text = text[:-2] + '.'
+    if text.endswith('..'):
+        text = text[:-1]
+
+    text = text.strip()
+
+    if text and not text.endswith(('.', '!', '?')):
+        text += '.'
+
+    return text
 
 class CitationStyle:
     def __init__(self, name="Custom"):
@@ -13,6 +127,7 @@ class CitationStyle:
         self.required_fields: List[str] = []
         self.author_format_config = AuthorFormatConfig.get_preset(AuthorFormat.LAST_FIRST_INITIALS)
         self.author_formatter = AuthorFormatter(self.author_format_config)
+        self._plan = None
 
     def set_field_order(self, fields):
         self.field_order = fields
@@ -33,89 +148,61 @@ class CitationStyle:
         self.author_format_config = config
         self.author_formatter = AuthorFormatter(config)
 
-    def format_item(self, item):
-        authors_formatted = item.format_authors(self.author_formatter)
+    def get_used_fields(self):
+        return frozenset(self.field_order) | frozenset(self.required_fields)
 
-        fields = item.get_all_fields()
-        fields['authors_str'] = authors_formatted
+    def fingerprint(self):
+        # Версия вывода входит в отпечаток: смена правил форматирования меняет и его
+        payload = OUTPUT_VERSION + json.dumps(self.to_dict(), sort_keys=True, ensure_ascii=False)
+        return hashlib.sha1(payload.encode('utf-8')).hexdigest()
 
-        prefix_dict = {
-            'volume': 'vol.',
-            'issue': 'no.',
-            'pages': 'pp.',
-            'doi': 'doi:',
-            'url': 'URL:'
-        }
-
-        formatted_parts = []
+    def copy(self):
+        return CitationStyle.from_dict(json.loads(json.dumps(self.to_dict())))
 
+    def _field_signatures(self):
+        last = len(self.field_order) - 1
+        positions = {}
         for i, field_name in enumerate(self.field_order):
-            if field_name in fields:
-                value = fields[field_name]
-                if value:
-                    formatter = self.field_formatters.get(field_name, "")
-                    separator = self.field_separators.get(field_name, ". ")
-
-                    formatted_value = str(value)
-                    if field_name in self.field_prefixes and self.field_prefixes[field_name]:
-                        prefix = prefix_dict.get(field_name, '')
-                        if prefix:
-                            formatted_value = f"{prefix} {formatted_value}"
-
-                    if formatter == "quotes":
-                        if separator.strip() in [',', ', ']:
-                            formatted_value = f'"{formatted_value}{separator.rstrip()}"'
-                            if i < len(self.field_order) - 1:
-                                formatted_value += " "
-                        else:
-                            formatted_value = f'"{formatted_value}"'
-                    elif formatter == "brackets":
-                        if separator.strip() in [",", ", "]:
-                            formatted_value = f"[{formatted_value}{separator.rstrip()}]"
-                            if i < len(self.field_order) - 1:
-                                formatted_value += " "
-                        else:
-                            formatted_value = f"[{formatted_value}]"
-                    else:
-                        formatted_value = formatted_value
-
-                    if formatter == "italic":
-                        formatted_value = f"*{formatted_value}*"
-                    elif formatter == "bold":
-                        formatted_value = f"**{formatted_value}**"
-
-                    if formatter == "quotes" and separator.strip() in [',', ', ']:
-                        formatted_parts.append(formatted_value)
-                    else:
-                        formatted_parts.append(formatted_value + separator)
-
-        result = "".join(filter(None, formatted_parts))
-        result = self._clean_result(result)
-        return result
+            positions.setdefault(field_name, []).append(i == last)
+        names = set(positions) | set(self.field_formatters) | set(self.field_separators) | set(self.field_prefixes)
+        return {
+            name: (tuple(positions.get(name, ())),
+                   self.field_formatters.get(name, ""),
+                   self.field_separators.get(name, ". "),
+                   bool(self.field_prefixes.get(name)))
+            for name in names
+        }
 
-    def _clean_result(self, result):
-        if not result:
-            return result
+    def diff(self, other):
+        # Поля, сегменты которых различаются в двух стилях, и затронутые типы записей
+        mine, theirs = self._field_signatures(), other._field_signatures()
+        changed = {name for name in set(mine) | set(theirs) if mine.get(name) != theirs.get(name)}
 
-        result = re.sub(r'\s+([.,;:])', r'\1', result)
-        result = re.sub(r'"\s{2,}', r'" ', result)
-        result = re.sub(r'"\s+,', r'",', result)
-        result = re.sub(r'"\s+\.', r'".', result)
-        result = re.sub(r'",(\d{4})', r'", \1', result)
-        result = re.sub(r'"\.(\d{4})', r'". \1', result)
-        result = re.sub(r'\s+', ' ', result)
+        common = set(self.field_order) & set(other.field_order)
+        my_sequence = [name for name in self.field_order if name in common]
+        their_sequence = [name for name in other.field_order if name in common]
+        for a, b in zip(my_sequence, their_sequence):
+            if a != b:
+                changed.update((a, b))
 
-        if result.endswith(' .'):
-            result = result[:-2] + '.'
-        if result.endswith('..'):
-            result = result[:-1]
+        if self.author_format_config.to_dict() != other.author_format_config.to_dict():
+            changed.add('authors_str')
 
-        result = result.strip()
+        resource_types = {
+            resource_type for resource_type in ResourceType
+            if changed & set(ITEM_CLASSES.get(resource_type, BibliographicItem).FIELDS)
+        }
+        return changed, resource_types
 
-        if result and not result.endswith(('.', '!', '?')):
-            result += '.'
+    def compile(self):
+        # Настройки могут меняться на месте, поэтому план сверяется с отпечатком стиля
+        fingerprint = self.fingerprint()
+        if self._plan is None or self._plan[0] != fingerprint:
+            self._plan = (fingerprint, StylePlan(self))
+        return self._plan[1]
 
-        return result
+    def format_item(self, item):
+        return self.compile().format_item(item)
 
     def validate_item(self, item):
         missing = item.get_missing_fields(self.required_fields)
@@ -154,4 +241,179 @@ class CitationStyle:
             author_config = AuthorFormatConfig.from_dict(data["author_format"])
             style.set_author_format(author_config)
 
-        return style
\ No newline at end of file
+        return style
+
+
+class StylePlan:
+    # Неизменяемый снимок настроек стиля: для каждого класса записи заранее
+    # вычисляются получатели значений и обрамление полей
+    __slots__ = ('_field_order', '_formatters', '_separators', '_prefixes',
+                 '_format_authors', '_required', '_bits', '_steps', '_checks')
+
+    def __init__(self, style):
+        self._field_order = tuple(style.field_order)
+        self._formatters = dict(style.field_formatters)
+        self._separators = dict(style.field_separators)
+        self._prefixes = dict(style.field_prefixes)
+        # Форматтер авторов собирается по копии конфигурации: правки стиля не меняют готовый план
+        config = AuthorFormatConfig.from_dict(json.loads(json.dumps(style.author_format_config.to_dict())))
+        self._format_authors = AuthorFormatter(config).compile()
+        self._required = tuple(style.required_fields)
+        # Каждому обязательному полю соответствует бит маски присутствия
+        self._bits = {}
+        for field_name in self._required:
+            self._bits.setdefault(field_name, 1 << len(self._bits))
+        self._steps = {}
+        self._checks = {}
+
+    def steps_for(self, item_cls):
+        steps = self._steps.get(item_cls)
+        if steps is None:
+            steps = self._steps[item_cls] = self._compile_steps(item_cls)
+        return steps
+
+    def checks_for(self, item_cls):
+        checks = self._checks.get(item_cls)
+        if checks is None:
+            checks = self._checks[item_cls] = self._compile_checks(item_cls)
+        return checks
+
+    def _compile_checks(self, item_cls):
+        # Маска обязательных полей класса и проверки полей, которых нет среди шагов форматирования
+        required_mask = 0
+        for bit in self._bits.values():
+            required_mask |= bit
+        covered = {step[0] for step in self.steps_for(item_cls) if step[4]}
+        checks = []
+        for field_name, bit in self._bits.items():
+            if field_name in covered:
+                continue
+            if field_name == 'authors_str':
+                # Результат проверки не является сегментом и не кэшируется
+                checks.append((None, _authors_str_present, bit))
+                continue
+            getter = self._field_getter(item_cls, field_name)
+            if getter is not None:
+                checks.append((field_name, getter, bit))
+        return required_mask, tuple(checks)
+
+    def _compile_steps(self, item_cls):
+        steps = []
+        last = len(self._field_order) - 1
+        for i, field_name in enumerate(self._field_order):
+            getter = self._field_getter(item_cls, field_name)
+            if getter is None:
+                continue
+
+            formatter = self._formatters.get(field_name, "")
+            separator = self._separators.get(field_name, ". ")
+            comma = separator.strip() in [',', ', ']
+            trailing = " " if i < last else ""
+
+            opening = ""
+            if self._prefixes.get(field_name):
+                prefix = FIELD_PREFIXES.get(field_name, '')
+                if prefix:
+                    opening = f"{prefix} "
+
+            if formatter == "quotes":
+                if comma:
+                    opening, closing = '"' + opening, f'{separator.rstrip()}"{trailing}'
+                else:
+                    opening, closing = '"' + opening, '"' + separator
+            elif formatter == "brackets":
+                if comma:
+                    opening, closing = '[' + opening, f"{separator.rstrip()}]{trailing}{separator}"
+                else:
+                    opening, closing = '[' + opening, ']' + separator
+            elif formatter == "italic":
+                opening, closing = '*' + opening, '*' + separator
+            elif formatter == "bold":
+                opening, closing = '**' + opening, '**' + separator
+            else:
+                closing = separator
+
+            # authors_str проверяется по формату авторов по умолчанию, а не по формату стиля
+            bit = self._bits.get(field_name, 0) if field_name != 'authors_str' else 0
+            steps.append((field_name, getter, _normalize_fragment(opening), _normalize_fragment(closing), bit))
+        return tuple(steps)
+
+    def _field_getter(self, item_cls, field_name):
+        if field_name == 'authors_str':
+            format_authors = self._format_authors
+            return lambda item: format_authors(item.authors)
+        if field_name not in getattr(item_cls, 'FIELDS', ()):
+            return None
+        if field_name in ('resource_type', 'authors'):
+            return lambda item: item.get_fields((field_name,))[field_name]
+        return attrgetter(field_name)
+
+    def format_item(self, item, segments=None):
+        return self._render(item, segments)[0]
+
+    def format_and_validate(self, item, segments=None):
+        text, present = self._render(item, segments)
+        return text, self._missing(item, present, segments)
+
+    def missing_fields(self, item, segments=None):
+        present = 0
+        for field_name, getter, opening, closing, bit in self.steps_for(type(item)):
+            if bit and _present(item, field_name, getter, segments):
+                present |= bit
+        return self._missing(item, present, segments)
+
+    def _render(self, item, segments):
+        # segments: кэш нормализованных значений полей записи, False — пустое поле
+        fragments = []
+        present = 0
+        for field_name, getter, opening, closing, bit in self.steps_for(type(item)):
+            text = _segment(item, field_name, getter, segments)
+            if text is False:
+                continue
+            present |= bit
+            if text:
+                fragments.append(opening)
+                fragments.append(text)
+                fragments.append(closing)
+        return _finish_text(_join_fragments(fragments)), present
+
+    def _missing(self, item, present, segments):
+        required_mask, checks = self.checks_for(type(item))
+        for field_name, getter, bit in checks:
+            if field_name is None:
+                if getter(item):
+                    present |= bit
+            elif _present(item, field_name, getter, segments):
+                present |= bit
+        missing_mask = required_mask & ~present
+        if not missing_mask:
+            return []
+        bits = self._bits
+        return [field_name for field_name in self._required if missing_mask & bits[field_name]]
+
+
+def _segment(item, field_name, getter, segments):
+    text = segments.get(field_name) if segments is not None else None
+    if text is None:
+        value = getter(item)
+        text = _normalize_fragment(f"{value}") if value else False
+        if segments is not None:
+            segments[field_name] = text
+    return text
+
+
+def _present(item, field_name, getter, segments):
+    # Для проверки достаточно истинности значения, нормализация не нужна
+    text = segments.get(field_name) if segments is not None else None
+    if text is not None:
+        return text is not False
+    return bool(getter(item))
+
+
+def _authors_str_present(item):
+    # Совпадает с проверкой get_missing_fields: пустую строку дает только
+    # единственный автор без фамилии и имени
+    authors = item.authors[:2]
+    if len(authors) != 1:
+        return bool(authors)
+    return bool(authors[0].last_name or authors[0].first_name)
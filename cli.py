@@ -0,0 +1,264 @@
+import argparse
+import errno
+import sys
+
+# Модуль импортирует только argparse: python-docx, tkinter и стили
+# загружаются внутри подкоманд, которым они нужны
+
+
+def _load_style(path):
+    import json
+    from citation_style import CitationStyle
+
+    with open(path, 'r', encoding='utf-8') as f:
+        return CitationStyle.from_dict(json.load(f))
+
+
+def _create_manager(args, style=None):
+    from bibliography_manager import BibliographyManager
+
+    manager = BibliographyManager()
+    if args.cache:
+        from reference_cache import ReferenceCache
+        manager.reference_cache = ReferenceCache(args.cache)
+    manager.current_style = style
+    return manager
+
+
+def _load_items(manager, args):
+    lines = manager.read_reference_lines(args.input)
+    return manager._parse_lines(lines, args.workers, field_mask=manager.style_field_mask())
+
+
+def _open_output(path):
+    if path is None or path == '-':
+        return sys.stdout
+    return open(path, 'w', encoding='utf-8')
+
+
+def cmd_parse(args):
+    import json
+
+    style = _load_style(args.style) if args.style else None
+    manager = _create_manager(args, style)
+    items = _load_items(manager, args)
+    out = _open_output(args.output)
+    try:
+        for item in items:
+            out.write(json.dumps(item.get_all_fields(), ensure_ascii=False) + "\n")
+    finally:
+        if out is not sys.stdout:
+            out.close()
+    print(f"Разобрано записей: {len(items)}", file=sys.stderr)
+    return 0
+
+
+def cmd_format(args):
+    manager = _create_manager(args, _load_style(args.style))
+    manager.items = _load_items(manager, args)
+    out = _open_output(args.output)
+    try:
+        for i, formatted in enumerate(manager.format_all_items(), 1):
+            out.write(f"{i}. {formatted}\n" if args.numbered else f"{formatted}\n")
+    finally:
+        if out is not sys.stdout:
+            out.close()
+    return 0
+
+
+def cmd_validate(args):
+    manager = _create_manager(args, _load_style(args.style))
+    manager.items = _load_items(manager, args)
+    invalid = 0
+    for i, (item, is_valid, missing) in enumerate(manager.validate_all_items(), 1):
+        if not is_valid:
+            invalid += 1
+            print(f"{i}. {item.title or item}: отсутствуют {', '.join(missing)}")
+    print(f"Проверено записей: {len(manager.items)}, с ошибками: {invalid}", file=sys.stderr)
+    return 1 if invalid else 0
+
+
+def cmd_convert(args):
+    style = _load_style(args.style)
+    if not args.cache:
+        # Без кэша чтение, разбор, форматирование и запись идут конвейером
+        import pipeline
+        stats = pipeline.convert_file(args.input, args.output, style, args.workers,
+                                      highlight_missing=not args.no_highlight)
+        print(f"Сохранено {stats['items']} записей в {args.output}", file=sys.stderr)
+        return 0
+
+    manager = _create_manager(args, style)
+    manager.items = _load_items(manager, args)
+    manager.save_to_docx(args.output, highlight_missing=not args.no_highlight, workers=args.workers)
+    print(f"Сохранено {len(manager.items)} записей в {args.output}", file=sys.stderr)
+    return 0
+
+
+def cmd_batch(args):
+    import json
+    import time
+    import batch
+
+    with open(args.style, 'r', encoding='utf-8') as f:
+        style_data = json.load(f)
+    base, inputs = batch.collect_inputs(args.inputs, args.output_dir)
+    if not inputs:
+        print(f"Нет DOCX файлов: {args.inputs}", file=sys.stderr)
+        return 1
+
+    jobs = [(path, batch.output_path_for(path, base, args.output_dir)) for path in inputs]
+    start = time.perf_counter()
+    if args.no_manifest:
+        results = batch.run_batch(jobs, style_data, args.workers, not args.no_highlight)
+    else:
+        manifest = batch.BatchManifest(args.manifest or batch.default_manifest_path(base, args.output_dir))
+        results = batch.run_incremental(jobs, style_data, manifest, args.workers,
+                                        not args.no_highlight, force=args.force)
+    summary = batch.summarize(results, time.perf_counter() - start)
+
+    print(batch.format_report(summary), file=sys.stderr)
+    if args.report:
+        with open(args.report, 'w', encoding='utf-8') as f:
+            json.dump(summary, f, ensure_ascii=False, indent=2)
+    return 1 if summary['failed_files'] else 0
+
+
+def _iter_input_lines(path):
+    import io
+
+    if path == '-':
+        # Поток читается построчно, некорректные байты не прерывают обработку
+        stream = io.TextIOWrapper(sys.stdin.buffer, encoding='utf-8', errors='replace')
+        yield from stream
+        return
+    with open(path, 'r', encoding='utf-8', errors='replace') as f:
+        yield from f
+
+
+def _filter_record(output_format, number, formatted, missing):
+    if output_format == 'jsonl':
+        import json
+        return json.dumps({"line": number, "formatted": formatted, "missing": missing}, ensure_ascii=False)
+    if output_format == 'tsv':
+        return f"{formatted.replace(chr(9), ' ')}\t{','.join(missing)}"
+    return formatted
+
+
+def cmd_filter(args):
+    # Одна строка на входе - одна строка на выходе, память не зависит от размера потока
+    from bibliography_manager import BibliographyManager
+
+    style = _load_style(args.style)
+    plan = style.compile()
+    field_mask = style.get_used_fields()
+    manager = BibliographyManager()
+    if hasattr(sys.stdout, 'reconfigure'):
+        sys.stdout.reconfigure(line_buffering=True)
+    write = sys.stdout.write
+    for number, line in enumerate(_iter_input_lines(args.input), 1):
+        item = manager._parse_reference(line, field_mask)
+        if item is None:
+            formatted, missing = "", []
+        else:
+            formatted, missing = plan.format_and_validate(item)
+        write(_filter_record(args.output_format, number, formatted, missing) + "\n")
+    return 0
+
+
+def _silence_stdout():
+    # Читатель закрыл канал (например, head): дальнейший вывод, включая сброс
+    # буфера при выходе, уходит в /dev/null
+    import os
+
+    devnull = os.open(os.devnull, os.O_WRONLY)
+    os.dup2(devnull, sys.stdout.fileno())
+
+
+def _is_broken_pipe(error):
+    # В Windows запись в закрытый канал дает OSError с EINVAL, а не BrokenPipeError;
+    # у ошибок открытия файлов заполнено имя файла
+    if isinstance(error, BrokenPipeError):
+        return True
+    return sys.platform == 'win32' and error.errno == errno.EINVAL and error.filename is None
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog='biblio-cli',
+                                     description='Форматирование библиографии без графического интерфейса')
+    common = argparse.ArgumentParser(add_help=False)
+    common.add_argument('--workers', type=int, default=None,
+                        help='Число процессов для разбора и экспорта больших списков')
+    common.add_argument('--cache', type=str, help='Файл SQLite для кэша разобранных записей')
+
+    subparsers = parser.add_subparsers(dest='command', metavar='КОМАНДА')
+    subparsers.required = True
+
+    parse = subparsers.add_parser('parse', parents=[common], help='Разобрать ссылки и вывести поля в JSON Lines')
+    parse.add_argument('input', help='DOCX или текстовый файл (одна ссылка на строку)')
+    parse.add_argument('--style', help='JSON файл стиля: разбираются только используемые им поля')
+    parse.add_argument('--output', help='Файл для результата (по умолчанию stdout)')
+    parse.set_defaults(func=cmd_parse)
+
+    fmt = subparsers.add_parser('format', parents=[common], help='Вывести отформатированные ссылки')
+    fmt.add_argument('input', help='DOCX или текстовый файл (одна ссылка на строку)')
+    fmt.add_argument('--style', required=True, help='JSON файл со стилем форматирования')
+    fmt.add_argument('--output', help='Файл для результата (по умолчанию stdout)')
+    fmt.add_argument('--numbered', action='store_true', help='Нумеровать записи')
+    fmt.set_defaults(func=cmd_format)
+
+    validate = subparsers.add_parser('validate', parents=[common],
+                                     help='Проверить обязательные поля (код выхода 1 при ошибках)')
+    validate.add_argument('input', help='DOCX или текстовый файл (одна ссылка на строку)')
+    validate.add_argument('--style', required=True, help='JSON файл со стилем форматирования')
+    validate.set_defaults(func=cmd_validate)
+
+    convert = subparsers.add_parser('convert', parents=[common], help='Сохранить отформатированный список в DOCX')
+    convert.add_argument('input', help='DOCX или текстовый файл (одна ссылка на строку)')
+    convert.add_argument('output', help='Путь к итоговому DOCX файлу')
+    convert.add_argument('--style', required=True, help='JSON файл со стилем форматирования')
+    convert.add_argument('--no-highlight', action='store_true', help='Не отмечать недостающие поля')
+    convert.set_defaults(func=cmd_convert)
+
+    batch = subparsers.add_parser('batch', help='Обработать каталог или шаблон DOCX файлов пулом процессов')
+    batch.add_argument('inputs', help='Каталог (обходится рекурсивно) или шаблон, например "subs/**/*.docx"')
+    batch.add_argument('--style', required=True, help='JSON файл со стилем форматирования')
+    batch.add_argument('--output-dir', help='Корень зеркального дерева для результатов '
+                                            '(по умолчанию рядом с исходными, с суффиксом .formatted)')
+    batch.add_argument('--workers', type=int, default=None, help='Число рабочих процессов')
+    batch.add_argument('--no-highlight', action='store_true', help='Не отмечать недостающие поля')
+    batch.add_argument('--report', help='JSON файл для сводного отчета')
+    batch.add_argument('--manifest', help='Файл манифеста для пропуска неизмененных файлов '
+                                          '(по умолчанию .biblio-manifest.json в каталоге результатов)')
+    batch.add_argument('--force', action='store_true', help='Обработать все файлы, даже неизмененные')
+    batch.add_argument('--no-manifest', action='store_true', help='Не читать и не обновлять манифест')
+    batch.set_defaults(func=cmd_batch)
+
+    filt = subparsers.add_parser('filter', help='Фильтр: ссылки построчно из stdin, отформатированные строки в stdout')
+    filt.add_argument('--style', required=True, help='JSON файл со стилем форматирования')
+    filt.add_argument('--input', default='-', help='Входной текстовый файл (по умолчанию stdin)')
+    filt.add_argument('--output-format', choices=['plain', 'jsonl', 'tsv'], default='plain',
+                      help='plain - только текст, jsonl - JSON Lines, tsv - текст и недостающие поля')
+    filt.set_defaults(func=cmd_filter)
+
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    try:
+        return args.func(args)
+    except OSError as e:
+        if not _is_broken_pipe(e):
+            print(f"Ошибка: {e}", file=sys.stderr)
+            return 1
+        _silence_stdout()
+        # Код возврата как у процесса, завершенного SIGPIPE
+        return 141
+    except ValueError as e:
+        print(f"Ошибка: {e}", file=sys.stderr)
+        return 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
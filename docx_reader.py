@@ -0,0 +1,119 @@
+import posixpath
+import zipfile
+import xml.etree.ElementTree as ET
+
+_W_NS = "http://schemas.openxmlformats.org/wordprocessingml/2006/main"
+_R_NS = "http://schemas.openxmlformats.org/officeDocument/2006/relationships"
+_PKG_REL_NS = "http://schemas.openxmlformats.org/package/2006/relationships"
+_OFFICE_DOCUMENT_REL = _R_NS + "/officeDocument"
+
+_BODY = f"{{{_W_NS}}}body"
+_P = f"{{{_W_NS}}}p"
+_R = f"{{{_W_NS}}}r"
+_HYPERLINK = f"{{{_W_NS}}}hyperlink"
+_T = f"{{{_W_NS}}}t"
+_TAB = f"{{{_W_NS}}}tab"
+_PTAB = f"{{{_W_NS}}}ptab"
+_BR = f"{{{_W_NS}}}br"
+_CR = f"{{{_W_NS}}}cr"
+_NO_BREAK_HYPHEN = f"{{{_W_NS}}}noBreakHyphen"
+_BR_TYPE = f"{{{_W_NS}}}type"
+_RID = f"{{{_R_NS}}}id"
+_RELATIONSHIP = f"{{{_PKG_REL_NS}}}Relationship"
+
+_DEFAULT_DOCUMENT_PART = "word/document.xml"
+
+
+def _find_document_part(archive):
+    try:
+        root = ET.fromstring(archive.read("_rels/.rels"))
+    except KeyError:
+        return _DEFAULT_DOCUMENT_PART
+
+    for rel in root.iter(_RELATIONSHIP):
+        if rel.get("Type") == _OFFICE_DOCUMENT_REL:
+            return posixpath.normpath(rel.get("Target", "").lstrip("/"))
+    return _DEFAULT_DOCUMENT_PART
+
+
+def _read_relationships(archive, part_name):
+    directory, filename = posixpath.split(part_name)
+    rels_name = posixpath.join(directory, "_rels", filename + ".rels")
+    try:
+        root = ET.fromstring(archive.read(rels_name))
+    except KeyError:
+        return {}
+
+    return {
+        rel.get("Id"): rel.get("Target")
+        for rel in root.iter(_RELATIONSHIP)
+        if rel.get("Id") and rel.get("Target")
+    }
+
+
+def _run_text(run):
+    parts = []
+    for child in run:
+        tag = child.tag
+        if tag == _T:
+            parts.append(child.text or "")
+        elif tag == _TAB or tag == _PTAB:
+            parts.append("\t")
+        elif tag == _CR:
+            parts.append("\n")
+        elif tag == _BR:
+            if child.get(_BR_TYPE, "textWrapping") == "textWrapping":
+                parts.append("\n")
+        elif tag == _NO_BREAK_HYPHEN:
+            parts.append("-")
+    return "".join(parts)
+
+
+def paragraph_text(p):
+    parts = []
+    for child in p:
+        if child.tag == _R:
+            parts.append(_run_text(child))
+        elif child.tag == _HYPERLINK:
+            for run in child:
+                if run.tag == _R:
+                    parts.append(_run_text(run))
+    return "".join(parts)
+
+
+def paragraph_urls(p, relationships):
+    seen = set()
+    urls = []
+    for h in p.iter(_HYPERLINK):
+        target = relationships.get(h.get(_RID))
+        if target and target not in seen:
+            seen.add(target)
+            urls.append(target)
+    return urls
+
+
+def iter_docx_paragraphs(filepath):
+    with zipfile.ZipFile(filepath) as archive:
+        part_name = _find_document_part(archive)
+        relationships = _read_relationships(archive, part_name)
+
+        with archive.open(part_name) as stream:
+            depth = 0
+            body = None
+            for event, elem in ET.iterparse(stream, events=("start", "end")):
+                if event == "start":
+                    depth += 1
+                    if depth == 2 and elem.tag == _BODY:
+                        body = elem
+                    continue
+
+                depth -= 1
+                if elem is body:
+                    body = None
+                if body is None or depth != 2:
+                    continue
+
+                if elem.tag == _P:
+                    yield paragraph_text(elem), paragraph_urls(elem, relationships)
+                elem.clear()
+                body.remove(elem)
@@ -0,0 +1,111 @@
+import io
+import os
+import re
+import zipfile
+
+_DOCUMENT_PART = "word/document.xml"
+_SECT_PR = b"<w:sectPr"
+_CHUNK_SIZE = 1 << 16
+
+_INVALID_XML_CHARS_RE = re.compile('[\x00-\x08\x0b\x0c\x0e-\x1f\ufffe\uffff]')
+_SPECIAL_CHARS_RE = re.compile(r'([\t\r\n])')
+
+_BOLD_RUN = '<w:r><w:rPr><w:b/></w:rPr>'
+_WARNING_RUN = '<w:r><w:rPr><w:i/><w:color w:val="FF0000"/></w:rPr>'
+_PLAIN_RUN = '<w:r>'
+
+
+def _escape(text):
+    # xml.sax.saxutils тянет за собой urllib, а экранировать нужно всего три символа
+    return text.replace('&', '&amp;').replace('<', '&lt;').replace('>', '&gt;')
+
+
+def _text_xml(text):
+    # Так же, как python-docx: табуляция и переводы строк становятся отдельными элементами
+    parts = []
+    for chunk in _SPECIAL_CHARS_RE.split(_INVALID_XML_CHARS_RE.sub('', text)):
+        if chunk == '\t':
+            parts.append('<w:tab/>')
+        elif chunk in ('\r', '\n'):
+            parts.append('<w:br/>')
+        elif chunk:
+            if chunk.strip() != chunk:
+                parts.append(f'<w:t xml:space="preserve">{_escape(chunk)}</w:t>')
+            else:
+                parts.append(f'<w:t>{_escape(chunk)}</w:t>')
+    return ''.join(parts)
+
+
+def render_entry(number, formatted, missing=None):
+    return render_number(number) + render_entry_body(formatted, missing)
+
+
+def render_number(number):
+    return f'<w:p>{_BOLD_RUN}{_text_xml(f"{number}. ")}</w:r>'
+
+
+def render_entry_body(formatted, missing=None):
+    # Абзац без номера: номер добавляется там, где известен порядок записей
+    parts = [_PLAIN_RUN, _text_xml(formatted), '</w:r>'] if formatted else ['<w:r/>']
+    if missing:
+        parts += [_WARNING_RUN, _text_xml(f" [Отсутствуют: {', '.join(missing)}]"), '</w:r>']
+    parts.append('</w:p>')
+    return ''.join(parts)
+
+
+def _skeleton(heading):
+    # Пустой документ python-docx с заголовком: все части, кроме тела, копируются как есть
+    from docx import Document
+
+    doc = Document()
+    doc.add_heading(heading, 0)
+    buffer = io.BytesIO()
+    doc.save(buffer)
+    buffer.seek(0)
+    with zipfile.ZipFile(buffer) as archive:
+        parts = [(info, archive.read(info.filename)) for info in archive.infolist()]
+
+    for i, (info, data) in enumerate(parts):
+        if info.filename == _DOCUMENT_PART:
+            position = data.rindex(_SECT_PR)
+            return parts, i, data[:position], data[position:]
+    raise ValueError("В шаблоне не найден word/document.xml")
+
+
+def write_docx(filepath, heading, paragraphs):
+    # Тело документа пишется порциями во временный файл рядом с итоговым; прежний
+    # документ заменяется только после успешной записи
+    parts, document_index, prefix, suffix = _skeleton(heading)
+    filepath = os.fspath(filepath)
+    temporary = filepath + '.tmp'
+    try:
+        _write_parts(temporary, parts, document_index, prefix, suffix, paragraphs)
+        os.replace(temporary, filepath)
+    except BaseException:
+        if os.path.exists(temporary):
+            os.remove(temporary)
+        raise
+
+
+def _write_parts(filepath, parts, document_index, prefix, suffix, paragraphs):
+    with zipfile.ZipFile(filepath, 'w', zipfile.ZIP_DEFLATED) as archive:
+        for i, (info, data) in enumerate(parts):
+            if i != document_index:
+                archive.writestr(info, data)
+                continue
+
+            with archive.open(_DOCUMENT_PART, 'w') as part:
+                part.write(prefix)
+                chunk = []
+                size = 0
+                for paragraph in paragraphs:
+                    if isinstance(paragraph, str):
+                        paragraph = paragraph.encode('utf-8')
+                    chunk.append(paragraph)
+                    size += len(paragraph)
+                    if size >= _CHUNK_SIZE:
+                        part.write(b''.join(chunk))
+                        chunk = []
+                        size = 0
+                part.write(b''.join(chunk))
+                part.write(suffix)
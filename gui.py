@@ -784,9 +784,7 @@ class TkinterGUI:
 
         if filepath:
             try:
-                items = self.manager.parse_docx(filepath)
-                for item in items:
-                    self.manager.add_item(item)
+                items = self.manager.load_docx(filepath)
 
                 filename = Path(filepath).name
                 self.load_status.config(text=f"Загружено из: {filename}")
@@ -813,7 +811,7 @@ class TkinterGUI:
 
         if messagebox.askyesno("Подтверждение",
                               f"Удалить все {len(self.manager.items)} записей?"):
-            self.manager.items.clear()
+            self.manager.clear_items()
             self.preview_text.delete(1.0, tk.END)
             self.load_status.config(text="Файл не выбран")
             self.load_info.config(text="Записи очищены")
@@ -1158,6 +1156,7 @@ class TkinterGUI:
 
         self.view_status.config(text=f"Записей: {len(self.manager.items)}")
 
+        formatted_items = self.manager.format_all_items() if self.manager.current_style else None
         for i, item in enumerate(self.manager.items, 1):
             if self.manager.current_style:
                 authors_formatted = item.format_authors(self.manager.current_style.author_formatter)
@@ -1179,9 +1178,8 @@ class TkinterGUI:
             elif isinstance(item, ElectronicResource) and item.website:
                 self.items_text.insert(tk.END, f"   Веб-сайт: {item.website}\n")
 
-            if self.manager.current_style:
-                formatted = self.manager.current_style.format_item(item)
-                self.items_text.insert(tk.END, f"   Формат: {formatted}\n")
+            if formatted_items:
+                self.items_text.insert(tk.END, f"   Формат: {formatted_items[i - 1]}\n")
 
             self.items_text.insert(tk.END, "-" * 80 + "\n\n")
 
@@ -4,29 +4,31 @@ import sys
 from pathlib import Path
 from bibliography_manager import BibliographyManager
 from citation_style import CitationStyle
-from gui import TkinterGUI
 
-try:
-    import tkinter as tk
-    from tkinter import ttk, filedialog, messagebox
-    GUI_AVAILABLE = True
-except ImportError:
-    GUI_AVAILABLE = False
-    print("Графический интерфейс недоступен. Установите tkinter (GUI будет отключен).")
+def gui_available():
+    # tkinter и gui импортируются только перед запуском окна; для консоли есть cli.py
+    try:
+        import tkinter
+    except ImportError:
+        return False
+    return True
 
 def main():
     parser = argparse.ArgumentParser(description='Программа форматирования библиографии')
     parser.add_argument('--input', type=str, help='Путь к входному DOCX файлу')
     parser.add_argument('--output', type=str, help='Путь для сохранения результата')
     parser.add_argument('--style', type=str, help='JSON файл со стилем форматирования')
+    parser.add_argument('--workers', type=int, default=None,
+                        help='Число процессов для разбора и экспорта больших списков литературы')
+    parser.add_argument('--cache', type=str,
+                        help='Файл SQLite для кэша разобранных записей')
 
     args = parser.parse_args()
 
-    if not GUI_AVAILABLE:
-        print("Ошибка: графический интерфейс недоступен")
-        return
-
     manager = BibliographyManager()
+    if args.cache:
+        from reference_cache import ReferenceCache
+        manager.reference_cache = ReferenceCache(args.cache)
 
     if args.style and Path(args.style).exists():
         try:
@@ -39,7 +41,8 @@ def main():
 
     if args.input and Path(args.input).exists():
         try:
-            items = manager.parse_docx(args.input)
+            items = manager.parse_docx(args.input, workers=args.workers,
+                                       field_mask=manager.style_field_mask())
             for item in items:
                 manager.add_item(item)
             print(f"Загружено {len(items)} записей из {args.input}")
@@ -48,15 +51,17 @@ def main():
 
     if args.input and args.output and manager.current_style:
         try:
-            manager.save_to_docx(args.output, highlight_missing=True)
+            manager.save_to_docx(args.output, highlight_missing=True, workers=args.workers)
             print(f"Сохранено в {args.output}")
             return
         except Exception as e:
             print(f"Ошибка экспорта: {e}")
 
-    if not GUI_AVAILABLE:
-        print("GUI недоступен: tkinter не установлен. Используйте CLI-режим или установите tkinter.")
+    if not gui_available():
+        print("GUI недоступен: tkinter не установлен. Используйте biblio-cli или установите tkinter.")
         return
+
+    from gui import TkinterGUI
     gui = TkinterGUI(manager)
     gui.run()
 
@@ -0,0 +1,233 @@
+import json
+import queue
+import threading
+from collections import deque
+from functools import partial
+
+DEFAULT_QUEUE_DEPTH = 4
+_POLL_INTERVAL = 0.1
+
+# Маркер конца потока; передается только между потоками, в процессы не попадает
+_END = object()
+
+# Менеджер рабочего процесса создается один раз на все пакеты
+_worker = {}
+
+
+class _Failure:
+    def __init__(self, error):
+        self.error = error
+
+
+class Stage:
+    # func применяется к каждому пакету; при processes > 1 - в пуле процессов,
+    # иначе в отдельном потоке. Для процессов func должна сериализоваться pickle
+    def __init__(self, func, processes=None):
+        self.func = func
+        self.processes = processes
+
+    @property
+    def uses_processes(self):
+        return bool(self.processes) and self.processes > 1
+
+
+class _Chain:
+    def __init__(self, funcs):
+        self.funcs = funcs
+
+    def __call__(self, batch):
+        for func in self.funcs:
+            batch = func(batch)
+        return batch
+
+
+def _fuse(stages):
+    # Соседние стадии в процессах выполняются одним вызовом: пакет не пересылается
+    # между процессами ради следующей стадии
+    fused = []
+    for stage in stages:
+        if fused and stage.uses_processes and fused[-1].uses_processes:
+            previous = fused.pop()
+            fused.append(Stage(_Chain([previous.func, stage.func]),
+                               max(previous.processes, stage.processes)))
+        else:
+            fused.append(stage)
+    return fused
+
+
+def _put(q, item, stop):
+    while not stop.is_set():
+        try:
+            q.put(item, timeout=_POLL_INTERVAL)
+            return True
+        except queue.Full:
+            continue
+    return False
+
+
+def _get(q, stop):
+    while not stop.is_set():
+        try:
+            return q.get(timeout=_POLL_INTERVAL)
+        except queue.Empty:
+            continue
+    return _END
+
+
+def _run_source(source, out, stop):
+    try:
+        for batch in source:
+            if not _put(out, batch, stop):
+                return
+    except BaseException as e:
+        _put(out, _Failure(e), stop)
+        return
+    _put(out, _END, stop)
+
+
+def _run_thread_stage(func, inp, out, stop):
+    while True:
+        batch = _get(inp, stop)
+        if batch is _END or isinstance(batch, _Failure):
+            _put(out, batch, stop)
+            return
+        try:
+            result = func(batch)
+        except BaseException as e:
+            _put(out, _Failure(e), stop)
+            return
+        if not _put(out, result, stop):
+            return
+
+
+def _run_process_stage(func, processes, depth, inp, out, stop):
+    import multiprocessing
+    from concurrent.futures import ProcessPoolExecutor
+
+    pending = deque()
+    try:
+        # Пул создается из потока, пока работают другие потоки конвейера; fork такого
+        # процесса может унаследовать захваченные блокировки, поэтому процессы запускаются заново
+        context = multiprocessing.get_context('spawn')
+        with ProcessPoolExecutor(max_workers=processes, mp_context=context) as executor:
+            try:
+                while True:
+                    batch = _get(inp, stop)
+                    if batch is _END or isinstance(batch, _Failure):
+                        break
+                    pending.append(executor.submit(func, batch))
+                    # В работе не больше depth пакетов, результаты уходят дальше по порядку
+                    if len(pending) >= depth and not _put(out, pending.popleft().result(), stop):
+                        return
+                while pending:
+                    if not _put(out, pending.popleft().result(), stop):
+                        return
+            finally:
+                for future in pending:
+                    future.cancel()
+    except BaseException as e:
+        _put(out, _Failure(e), stop)
+        return
+    _put(out, batch, stop)
+
+
+def run_pipeline(source, stages, queue_depth=DEFAULT_QUEUE_DEPTH):
+    # source читается в отдельном потоке, стадии соединены очередями длиной queue_depth,
+    # поэтому в памяти одновременно находится ограниченное число пакетов.
+    # Результаты последней стадии возвращаются в исходном порядке
+    stop = threading.Event()
+    inp = queue.Queue(queue_depth)
+    threads = [threading.Thread(target=_run_source, args=(source, inp, stop), daemon=True)]
+    for stage in _fuse(stages):
+        out = queue.Queue(queue_depth)
+        if stage.uses_processes:
+            args = (stage.func, stage.processes, queue_depth, inp, out, stop)
+            threads.append(threading.Thread(target=_run_process_stage, args=args, daemon=True))
+        else:
+            threads.append(threading.Thread(target=_run_thread_stage,
+                                            args=(stage.func, inp, out, stop), daemon=True))
+        inp = out
+
+    for thread in threads:
+        thread.start()
+    try:
+        while True:
+            batch = inp.get()
+            if batch is _END:
+                return
+            if isinstance(batch, _Failure):
+                raise batch.error
+            yield batch
+    finally:
+        stop.set()
+        for thread in threads:
+            thread.join()
+
+
+def batched(iterable, size):
+    batch = []
+    for value in iterable:
+        batch.append(value)
+        if len(batch) >= size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def _worker_manager():
+    if 'manager' not in _worker:
+        from bibliography_manager import BibliographyManager
+        _worker['manager'] = BibliographyManager()
+    return _worker['manager']
+
+
+def parse_batch(field_mask, lines):
+    from bibliography_manager import _parse_reference_batch
+
+    manager = _worker_manager()
+    return _parse_reference_batch(type(manager), lines, manager, field_mask=field_mask)
+
+
+def format_batch(style_json, highlight_missing, items):
+    # Абзацы без номеров: нумерация зависит от числа записей в предыдущих пакетах
+    from bibliography_manager import _worker_style_plan
+    from docx_writer import render_entry_body
+
+    plan = _worker_style_plan(style_json)
+    entries = []
+    for item in items:
+        if highlight_missing:
+            formatted, missing = plan.format_and_validate(item)
+        else:
+            formatted, missing = plan.format_item(item), None
+        entries.append((render_entry_body(formatted, missing), bool(missing)))
+    return entries
+
+
+def convert_file(input_path, output_path, style, workers=None, highlight_missing=True,
+                 queue_depth=DEFAULT_QUEUE_DEPTH, batch_size=None):
+    # Чтение, разбор, форматирование и запись DOCX идут одновременно; весь список
+    # записей в памяти не собирается
+    from bibliography_manager import PARALLEL_BATCH_SIZE, BibliographyManager
+    from docx_writer import render_number, write_docx
+
+    # У потока чтения свой менеджер: стадии в потоках пользуются менеджером модуля
+    reader = BibliographyManager()
+    lines = batched(reader.iter_reference_lines(input_path), batch_size or PARALLEL_BATCH_SIZE)
+    style_json = json.dumps(style.to_dict(), ensure_ascii=False)
+    stages = [
+        Stage(partial(parse_batch, style.get_used_fields()), workers),
+        Stage(partial(format_batch, style_json, highlight_missing), workers),
+    ]
+    stats = {'items': 0, 'invalid': 0}
+
+    def paragraphs():
+        for entries in run_pipeline(lines, stages, queue_depth):
+            for body, missing in entries:
+                stats['items'] += 1
+                stats['invalid'] += missing
+                yield render_number(stats['items']) + body
+
+    write_docx(output_path, 'Список литературы', paragraphs())
+    return stats
@@ -0,0 +1,100 @@
+import hashlib
+import pickle
+import re
+import sqlite3
+import time
+
+_WHITESPACE_RE = re.compile(r'\s+')
+_SQLITE_MAX_VARIABLES = 900
+
+
+class ReferenceCache:
+    def __init__(self, path, max_entries=100000):
+        self.path = str(path)
+        self.max_entries = max_entries
+        self._conn = sqlite3.connect(self.path)
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS refs ("
+            "key TEXT PRIMARY KEY, item BLOB, last_used REAL NOT NULL)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS refs_last_used ON refs(last_used)")
+        self._conn.commit()
+
+    def make_key(self, text, parser_version=""):
+        normalized = _WHITESPACE_RE.sub(' ', text).strip()
+        payload = f"{parser_version}\x00{normalized}".encode('utf-8')
+        return hashlib.sha256(payload).hexdigest()
+
+    def get_many(self, texts, parser_version=""):
+        keys = [self.make_key(t, parser_version) for t in texts]
+        found = {}
+        unique_keys = list(dict.fromkeys(keys))
+        for i in range(0, len(unique_keys), _SQLITE_MAX_VARIABLES):
+            chunk = unique_keys[i:i + _SQLITE_MAX_VARIABLES]
+            placeholders = ','.join('?' * len(chunk))
+            rows = self._conn.execute(
+                f"SELECT key, item FROM refs WHERE key IN ({placeholders})", chunk
+            )
+            for key, blob in rows:
+                found[key] = blob
+
+        if found:
+            now = time.time()
+            self._conn.executemany(
+                "UPDATE refs SET last_used = ? WHERE key = ?",
+                [(now, key) for key in found]
+            )
+            self._conn.commit()
+
+        results = []
+        for key in keys:
+            # Каждое вхождение получает свою копию: записи изменяемы.
+            results.append(self._load(found[key]) if key in found else None)
+        return results
+
+    def _load(self, blob):
+        try:
+            return pickle.loads(blob)
+        except Exception:
+            return None
+
+    def get(self, text, parser_version=""):
+        return self.get_many([text], parser_version)[0]
+
+    def put_many(self, pairs, parser_version=""):
+        now = time.time()
+        rows = [(self.make_key(text, parser_version), pickle.dumps(item), now)
+                for text, item in pairs]
+        if not rows:
+            return
+        self._conn.executemany(
+            "INSERT OR REPLACE INTO refs (key, item, last_used) VALUES (?, ?, ?)", rows
+        )
+        self._evict()
+        self._conn.commit()
+
+    def put(self, text, item, parser_version=""):
+        self.put_many([(text, item)], parser_version)
+
+    def _evict(self):
+        if not self.max_entries:
+            return
+        (count,) = self._conn.execute("SELECT COUNT(*) FROM refs").fetchone()
+        excess = count - self.max_entries
+        if excess > 0:
+            self._conn.execute(
+                "DELETE FROM refs WHERE key IN "
+                "(SELECT key FROM refs ORDER BY last_used ASC LIMIT ?)",
+                (excess,)
+            )
+
+    def clear(self):
+        self._conn.execute("DELETE FROM refs")
+        self._conn.commit()
+
+    def close(self):
+        self._conn.close()
+
+    def __len__(self):
+        (count,) = self._conn.execute("SELECT COUNT(*) FROM refs").fetchone()
+        return count
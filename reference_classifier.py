@@ -0,0 +1,121 @@
+import re
+from enum import IntFlag
+
+
+class ReferenceFeature(IntFlag):
+    ARTICLE = 1
+    BOOK = 2
+    CONFERENCE = 4
+    ELECTRONIC = 8
+    ARTICLE_NUMBERS = 16
+
+
+FEATURE_ARTICLE = int(ReferenceFeature.ARTICLE)
+FEATURE_BOOK = int(ReferenceFeature.BOOK)
+FEATURE_CONFERENCE = int(ReferenceFeature.CONFERENCE)
+FEATURE_ELECTRONIC = int(ReferenceFeature.ELECTRONIC)
+
+ARTICLE_KEYWORDS = ['vol.', 'no.', 'pp.', 'p. ', 'journal', 'trans.', 'proc.', 'doi:']
+BOOK_KEYWORDS = ['ed.', 'edition', 'publisher', 'press', 'isbn', 'chap.']
+CONFERENCE_KEYWORDS = ['conference', 'proc.', 'proceedings', 'symposium', 'workshop']
+ELECTRONIC_KEYWORDS = ['http://', 'https://', 'www.', 'accessed', 'retrieved']
+
+ARTICLE_NUMBERS_RE = re.compile(r'\d{4},\s*\d+,\s*\d+[-–]\d+')
+
+
+def _trie_pattern(words):
+    trie = {}
+    for word in words:
+        node = trie
+        for ch in word:
+            node = node.setdefault(ch, {})
+        node[''] = {}
+
+    def build(node):
+        is_end = '' in node
+        branches = [re.escape(ch) + build(child) for ch, child in sorted(node.items()) if ch]
+        if not branches:
+            return ''
+        if len(branches) == 1 and not is_end:
+            return branches[0]
+        group = '(?:' + '|'.join(branches) + ')'
+        return group + '?' if is_end else group
+
+    return build(trie)
+
+
+class KeywordClassifier:
+    def __init__(self, keyword_features):
+        self.keyword_features = dict(keyword_features)
+        self._members = {}
+        self._features = {}
+        for alternative in self._expand_overlaps(list(self.keyword_features)):
+            members = [(offset, keyword)
+                       for offset in range(len(alternative))
+                       for keyword in self.keyword_features
+                       if alternative.startswith(keyword, offset)]
+            features = 0
+            for _, keyword in members:
+                features |= self.keyword_features[keyword]
+            self._members[alternative] = members
+            self._features[alternative] = features
+        self._pattern = re.compile(_trie_pattern(self._members))
+
+    @staticmethod
+    def _expand_overlaps(keywords):
+        # Совпадения регулярного выражения не перекрываются: слово, начинающееся
+        # внутри найденного и выходящее за его конец, было бы пропущено.
+        # Такие сцепки добавляются как отдельные, более длинные альтернативы.
+        limit = sum(len(k) for k in keywords)
+        alternatives = set(keywords)
+        pending = list(keywords)
+        while pending:
+            current = pending.pop()
+            for offset in range(1, len(current)):
+                tail = current[offset:]
+                for keyword in keywords:
+                    if len(keyword) > len(tail) and keyword.startswith(tail):
+                        combined = current[:offset] + keyword
+                        if len(combined) > limit:
+                            raise ValueError(f"Ключевые слова перекрываются неограниченно: {keyword!r}")
+                        if combined not in alternatives:
+                            alternatives.add(combined)
+                            pending.append(combined)
+        return alternatives
+
+    def scan(self, text_lower):
+        features = 0
+        table = self._features
+        for alternative in self._pattern.findall(text_lower):
+            features |= table[alternative]
+        return features
+
+    def iter_matches(self, text_lower):
+        for m in self._pattern.finditer(text_lower):
+            for offset, keyword in self._members[m.group()]:
+                yield m.start() + offset, keyword
+
+
+def _build_keyword_features():
+    features = {}
+    for flag, keywords in ((FEATURE_ARTICLE, ARTICLE_KEYWORDS),
+                           (FEATURE_BOOK, BOOK_KEYWORDS),
+                           (FEATURE_CONFERENCE, CONFERENCE_KEYWORDS),
+                           (FEATURE_ELECTRONIC, ELECTRONIC_KEYWORDS)):
+        for keyword in keywords:
+            features[keyword] = features.get(keyword, 0) | flag
+    return features
+
+
+REFERENCE_CLASSIFIER = KeywordClassifier(_build_keyword_features())
+
+
+def reference_features(text):
+    features = REFERENCE_CLASSIFIER.scan(text.lower())
+    if ARTICLE_NUMBERS_RE.search(text):
+        features |= int(ReferenceFeature.ARTICLE_NUMBERS)
+    return ReferenceFeature(features)
+
+
+def matched_keywords(text):
+    return sorted(REFERENCE_CLASSIFIER.iter_matches(text.lower()))
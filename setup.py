@@ -1,3 +1,4 @@
+import re
 from setuptools import setup, find_packages
 
 with open("README.md", "r", encoding="utf-8") as fh:
@@ -6,9 +7,12 @@ with open("README.md", "r", encoding="utf-8") as fh:
 with open("requirements.txt", "r", encoding="utf-8") as fh:
     requirements = [line.strip() for line in fh if line.strip() and not line.startswith("#")]
 
+with open("version.py", "r", encoding="utf-8") as fh:
+    version = re.search(r'^__version__ = "([^"]+)"', fh.read(), re.M).group(1)
+
 setup(
     name="bibliography-formatter",
-    version="1.0.0",
+    version=version,
     author="Reterons",
     author_email="zhirnovv72@gmail.com",
     description="A tool for formatting bibliographic references",
@@ -16,6 +20,11 @@ setup(
     long_description_content_type="text/markdown",
     url="https://github.com/Reterons/bibliography_formatter",
     packages=find_packages(),
+    py_modules=[
+        "author", "author_formatter", "batch", "bibliography", "bibliography_manager",
+        "citation_style", "cli", "docx_reader", "docx_writer", "gui", "main", "pipeline",
+        "reference_cache", "reference_classifier", "version",
+    ],
     classifiers=[
         "Programming Language :: Python :: 3",
         "License :: OSI Approved :: MIT License",
@@ -26,6 +35,7 @@ setup(
     entry_points={
         "console_scripts": [
             "biblio-formatter=main:main",
+            "biblio-cli=cli:main",
         ],
     },
 )
@@ -114,5 +114,946 @@ def test_author_formatter():
     
     assert formatted == "Иванов И.И."
 
+def test_manager_doi_cleanup():
+    """Тест удаления DOI и префиксов полей без динамических регулярных выражений"""
+    from bibliography_manager import BibliographyManager
+
+    manager = BibliographyManager()
+    assert manager._clean_extracted_value("DOI = 10.1000/xyz.", "doi") == "10.1000/xyz"
+    assert manager._clean_extracted_value("url = 10.1000/xyz", "doi") == "url = 10.1000/xyz"
+
+    text = "Journal, 2020. DOI: 10.1000/XYZ, see also doi 10.1000/xyz"
+    assert manager._strip_doi_from_text(text, "10.1000/xyz") == "Journal, 2020. , see also"
+    assert manager._strip_doi_from_text("vol. 3 abc-1 ABC-1", "abc-1") == "vol. 3"
+
+def test_iter_docx_references_matches_parse_docx(tmp_path):
+    """Тест потокового чтения DOCX: результат совпадает с parse_docx"""
+    from docx import Document
+    from docx.oxml import OxmlElement
+    from docx.oxml.ns import qn
+    from docx.opc.constants import RELATIONSHIP_TYPE as RT
+    from bibliography_manager import BibliographyManager
+
+    doc = Document()
+    doc.add_heading('Список литературы', 0)
+    doc.add_paragraph('1. Smith, J. "Deep learning," Nature, vol. 5, no. 2, pp. 10-20, 2020.')
+    para = doc.add_paragraph('2. Ivanov, I. I. Online resource. Accessed 2021-01-01.')
+    rid = para.part.relate_to('https://example.org/page', RT.HYPERLINK, is_external=True)
+    hyperlink = OxmlElement('w:hyperlink')
+    hyperlink.set(qn('r:id'), rid)
+    run = OxmlElement('w:r')
+    text = OxmlElement('w:t')
+    text.text = ' link'
+    run.append(text)
+    hyperlink.append(run)
+    para._p.append(hyperlink)
+    doc.add_table(rows=1, cols=1).cell(0, 0).text = 'Jones, A. Table text. 2019.'
+    path = tmp_path / "refs.docx"
+    doc.save(str(path))
+
+    manager = BibliographyManager()
+    expected = manager.parse_docx(str(path))
+    streamed = list(manager.iter_docx_references(str(path)))
+
+    assert len(streamed) == len(expected) == 3
+    for a, b in zip(expected, streamed):
+        assert type(a) is type(b)
+        assert vars(a) == vars(b)
+    assert streamed[2].url == 'https://example.org/page'
+
+def test_parallel_parse_keeps_order(monkeypatch):
+    """Тест параллельного разбора: порядок записей совпадает с последовательным"""
+    import bibliography_manager
+    from bibliography_manager import BibliographyManager
+
+    monkeypatch.setattr(bibliography_manager, 'PARALLEL_MIN_LINES', 4)
+    monkeypatch.setattr(bibliography_manager, 'PARALLEL_BATCH_SIZE', 3)
+
+    lines = [f'Author{i}, A. Title number {i}. Journal, vol. {i}, 20{10 + i % 10}.'
+             for i in range(10)]
+    manager = BibliographyManager()
+    serial = manager._parse_lines(lines)
+    parallel = manager._parse_lines(lines, workers=2)
+
+    assert [item.volume for item in parallel] == [str(i) for i in range(10)]
+    assert [vars(a) for a in serial] == [vars(b) for b in parallel]
+
+def test_reference_cache_skips_parsing(tmp_path):
+    """Тест кэша разобранных записей: повторный разбор берется из кэша"""
+    from bibliography_manager import BibliographyManager
+    from reference_cache import ReferenceCache
+
+    cache = ReferenceCache(tmp_path / "refs.sqlite", max_entries=2)
+    manager = BibliographyManager(reference_cache=cache)
+    lines = ['Smith, J. First title. Nature, vol. 1, 2020.',
+             'Jones, A. Second title. Science, vol. 2, 2021.']
+    first = manager._parse_lines(lines)
+
+    calls = []
+    manager._parse_reference = lambda text: calls.append(text)
+    second = manager._parse_lines(['Smith, J.  First title.  Nature, vol. 1, 2020.', lines[1]])
+
+    assert calls == []
+    assert [vars(a) for a in first] == [vars(b) for b in second]
+    assert second[0] is not first[0]
+
+    cache.put('Third, C. Third title. 2022.', first[0])
+    assert len(cache) == 2
+    cache.close()
+
+def test_incremental_docx_reload(tmp_path):
+    """Тест повторной загрузки DOCX: разбираются только измененные абзацы"""
+    from docx import Document
+    from bibliography_manager import BibliographyManager
+    from bibliography import Book
+
+    refs = [f'Author{i}, A. Title {i}. Journal, vol. {i}, 2020.' for i in range(5)]
+    path = tmp_path / "refs.docx"
+
+    def save(lines):
+        doc = Document()
+        for line in lines:
+            doc.add_paragraph(line)
+        doc.save(str(path))
+
+    save(refs)
+    manager = BibliographyManager()
+    manual = Book(title="Ручная запись")
+    manager.add_item(manual)
+    first = manager.load_docx(str(path))
+    items_list = manager.items
+
+    edited = list(refs)
+    edited[1] = 'Author1, A. Edited title. Journal, vol. 42, 2021.'
+    edited.insert(3, 'New, N. Inserted title. Journal, vol. 7, 2022.')
+    del edited[-1]
+    save(edited)
+
+    parsed = []
+    original = manager._parse_reference
+    manager._parse_reference = lambda text: parsed.append(text) or original(text)
+    second = manager.load_docx(str(path))
+
+    assert len(parsed) == 2
+    assert manager.items is items_list
+    assert manager.items == [manual] + second
+    assert [item.volume for item in second] == ['0', '42', '2', '7', '3']
+    assert second[0] is first[0] and second[2] is first[2] and second[4] is first[3]
+
+    # После очистки списка документ разбирается заново, разметка хранится для последних документов
+    manager.clear_items()
+    assert manager.items is items_list and not manager._loaded_documents
+    assert len(manager.load_docx(str(path))) == 5 and len(parsed) == 7
+    other = tmp_path / "other.docx"
+    other.write_bytes(path.read_bytes())
+    manager.LOADED_DOCUMENTS_LIMIT = 1
+    manager.load_docx(str(other))
+    assert list(manager._loaded_documents) == [str(other.resolve())]
+
+def test_docx_hyperlinks_assigned_per_paragraph(tmp_path):
+    """Тест ссылок из гиперссылок DOCX: совпадение с прежним поиском по каждому абзацу"""
+    from docx import Document
+    from docx.opc.constants import RELATIONSHIP_TYPE as RT
+    from docx.oxml import OxmlElement
+    from docx.oxml.ns import qn
+    from bibliography_manager import BibliographyManager
+
+    doc = Document()
+    doc.add_heading('Список литературы', 0)
+
+    def add(paragraph, url, text="ссылка"):
+        hyperlink = OxmlElement('w:hyperlink')
+        hyperlink.set(qn('r:id'), paragraph.part.relate_to(url, RT.HYPERLINK, is_external=True))
+        run = OxmlElement('w:r')
+        t = OxmlElement('w:t')
+        t.text = text
+        run.append(t)
+        hyperlink.append(run)
+        paragraph._p.append(hyperlink)
+
+    p = doc.add_paragraph("1. Smith, J. First title. 2020. ")
+    add(p, "https://one.example/a")
+    p = doc.add_paragraph()
+    p.add_run("2. Brown, K. Second title. 2019.").add_break()
+    p.add_run("3. Green, L. Third title. 2018.")
+    add(p, "https://two.example/b")
+    add(p, "https://three.example/c")
+    p = doc.add_paragraph()
+    p.add_run("4. White, M. Fourth title. 2017.").add_break()
+    p.add_run("5. Black, N. Fifth title. 2016.").add_break()
+    p.add_run("6. Gray, O. Sixth title. 2015.")
+    add(p, "https://four.example/d")
+    add(p, "https://four.example/d")
+    add(p, "https://five.example/e")
+    doc.add_paragraph("7. Stone, P. Seventh title, https://own.example/f. 2014.")
+    p = doc.add_paragraph("8. Reed, R. Eighth title. 2013. ")
+    add(p, "https://one.example/a")
+    path = tmp_path / "links.docx"
+    doc.save(str(path))
+
+    def paragraph_urls(para):
+        # Прежняя реализация: XPath по гиперссылкам абзаца и поиск связи по r:id
+        urls = []
+        for h in para._p.xpath('.//w:hyperlink'):
+            rel = para.part.rels.get(h.get(qn('r:id')))
+            if rel is not None and str(rel.target_ref) not in urls:
+                urls.append(str(rel.target_ref))
+        return urls
+
+    reference = Document(str(path))
+    expected = [paragraph_urls(para) for para in reference.paragraphs if para.text.strip()]
+    manager = BibliographyManager()
+    assert [urls for _, urls in manager._read_docx_paragraphs(str(path))] == expected
+    assert expected[3] == ["https://four.example/d", "https://five.example/e"]
+
+    items = manager.parse_docx(str(path))
+    # Первая запись - заголовок документа
+    assert [item.url for item in items[1:]] == [
+        "https://one.example/a", "https://two.example/b", "https://three.example/c",
+        "", "", "https://five.example/e", "https://own.example/f", "https://one.example/a",
+    ]
+
+def test_reference_classifier_features():
+    """Тест классификатора типов: перекрывающиеся ключевые слова не теряются"""
+    from reference_classifier import ReferenceFeature, reference_features, matched_keywords
+    from bibliography_manager import BibliographyManager
+    from bibliography import Book, ElectronicResource
+
+    features = reference_features('Smith, J. Page. Accessed. Online')
+    assert features == ReferenceFeature.BOOK | ReferenceFeature.ELECTRONIC
+    assert matched_keywords('Accessed.') == [(0, 'accessed'), (6, 'ed.')]
+    assert ReferenceFeature.ARTICLE_NUMBERS in reference_features('Nature, 2020, 5, 10-20')
+
+    manager = BibliographyManager()
+    assert isinstance(manager._parse_reference('Smith, J. Page. Accessed. Online'), Book)
+    assert isinstance(manager._parse_reference('Smith, J. Page. https://example.org'),
+                      ElectronicResource)
+
+def test_parsed_authors_are_interned():
+    """Тест кэша авторов: одинаковые авторы разделяют один неизменяемый объект"""
+    import pickle
+    import dataclasses
+    from bibliography_manager import BibliographyManager
+
+    manager = BibliographyManager()
+    first = manager._parse_reference('Smith, J.; Ivanov, I. I. "First title," Nature, vol. 1, 2020.')
+    second = manager._parse_reference('Ivanov, I. I.; Smith, J. "Second title," Nature, vol. 2, 2021.')
+
+    assert first.authors[0] is second.authors[1]
+    assert first.authors[1] is second.authors[0]
+    assert pickle.loads(pickle.dumps(first)).authors[0] is first.authors[0]
+    with pytest.raises(dataclasses.FrozenInstanceError):
+        first.authors[0].last_name = "Jones"
+
+    # Автор, добавленный вручную через интерфейс, - тот же объект
+    from author import Author
+    assert Author.parse("Smith, J.") is first.authors[0]
+
+def test_lazy_fields_match_eager_parse():
+    """Тест отложенного извлечения: поля вне стиля вычисляются при обращении"""
+    import pickle
+    from bibliography_manager import BibliographyManager
+    from citation_style import CitationStyle
+
+    manager = BibliographyManager()
+    style = CitationStyle("Краткий")
+    style.set_field_order(['authors_str', 'title', 'year'])
+    style.set_required_fields(['title', 'year'])
+
+    text = 'Smith, J. "Title," Nature, vol. 5, no. 2, pp. 10-20, 2020. doi:10.1000/xyz'
+    eager = manager._parse_reference(text)
+    lazy = manager._parse_reference(text, style.get_used_fields())
+
+    assert set(lazy._deferred) == {'journal', 'volume', 'issue', 'pages', 'publisher',
+                                   'url', 'doi', 'accessed_date'}
+    assert style.format_item(lazy) == style.format_item(eager)
+    assert 'journal' in lazy._deferred
+    assert lazy.volume == eager.volume == "5"
+    restored = pickle.loads(pickle.dumps(lazy))
+    assert set(restored._deferred) == set(lazy._deferred)
+    assert restored.journal == eager.journal
+    restored.resolve_fields()
+    assert vars(restored) == vars(eager)
+
+    lazy.doi = "10.1000/abc"
+    assert 'doi' not in lazy._deferred
+    assert pickle.loads(pickle.dumps(lazy)).doi == "10.1000/abc"
+
+def test_benchmark_corpus_is_reproducible(tmp_path):
+    """Тест генератора корпуса: одинаковое зерно дает одинаковые записи всех типов"""
+    from benchmarks.corpus import CorpusGenerator, build_corpus
+    from bibliography_manager import BibliographyManager
+    from bibliography import ResourceType
+
+    references = CorpusGenerator(seed=3).references(300)
+    assert references == CorpusGenerator(seed=3).references(300)
+
+    manager = BibliographyManager()
+    items = [manager._parse_reference(r) for r in references]
+    assert {item.resource_type for item in items if item} == {
+        ResourceType.ARTICLE, ResourceType.BOOK, ResourceType.CONFERENCE, ResourceType.ELECTRONIC}
+
+    text_path, docx_path = build_corpus(tmp_path, 50, seed=3)
+    assert len(text_path.read_text(encoding='utf-8').splitlines()) == 50
+    assert manager.parse_docx(str(docx_path))
+
+def test_compiled_style_plan():
+    """Тест скомпилированного стиля: результат совпадает, снимок не зависит от правок"""
+    from citation_style import CitationStyle
+    from bibliography import Article, BibliographicItem
+    from author import Author
+
+    style = CitationStyle("Тест")
+    style.set_field_order(['authors_str', 'title', 'journal', 'volume', 'year'])
+    style.set_field_format('title', 'quotes')
+    style.set_field_separator('title', ', ')
+    style.set_field_format('journal', 'italic')
+    style.set_field_prefix('volume', True)
+
+    article = Article(authors=[Author("Иванов", "И", "И")], title="Статья", year=2020,
+                      journal="Журнал", volume="5")
+    plan = style.compile()
+    assert plan.format_item(article) == style.format_item(article)
+    assert plan.format_item(article).endswith(' "Статья," *Журнал*. vol. 5. 2020.')
+    assert plan.format_item(BibliographicItem(title="Книга")) == '"Книга,".'
+
+    assert style.compile() is plan
+
+    style.set_field_format('journal', 'bold')
+    assert '*Журнал*.' in plan.format_item(article)
+    assert '**Журнал**' in style.format_item(article)
+    assert style.compile() is not plan
+
+    # Правка формата авторов на месте тоже не меняет готовый план
+    plan = style.compile()
+    style.author_format_config.and_word = " and "
+    two_authors = Article(authors=[Author("Иванов", "И", "И"), Author("Петров", "П", "П")], title="Статья")
+    assert plan.format_item(two_authors).startswith("Иванов И.И. и Петров П.П.")
+    assert style.format_item(two_authors).startswith("Иванов И.И. and Петров П.П.")
+
+def test_join_time_punctuation_matches_clean_result():
+    """Тест склейки фрагментов: результат совпадает с очисткой регулярными выражениями"""
+    import random
+    import re
+    import citation_style
+    from benchmarks.corpus import CorpusGenerator
+    from bibliography_manager import BibliographyManager
+
+    def clean_result(result):
+        # Прежняя очистка готовой строки регулярными выражениями - эталон для склейки
+        if not result:
+            return result
+
+        result = re.sub(r'\s+([.,;:])', r'\1', result)
+        result = re.sub(r'"\s{2,}', r'" ', result)
+        result = re.sub(r'"\s+,', r'",', result)
+        result = re.sub(r'"\s+\.', r'".', result)
+        result = re.sub(r'",(\d{4})', r'", \1', result)
+        result = re.sub(r'"\.(\d{4})', r'". \1', result)
+        result = re.sub(r'\s+', ' ', result)
+
+        if result.endswith(' .'):
+            result = result[:-2] + '.'
+        if result.endswith('..'):
+            result = result[:-1]
+
+        result = result.strip()
+
+        if result and not result.endswith(('.', '!', '?')):
+            result += '.'
+
+        return result
+
+    def joined(fragments):
+        normalized = [citation_style._normalize_fragment(f) for f in fragments]
+        return citation_style._finish_text(citation_style._join_fragments(normalized))
+
+    rnd = random.Random(0)
+    alphabet = [' ', '  ', '\t', '\n', '\xa0', '"', ',', '.', ';', ':', '!', '1', '2', 'a', 'я']
+    for _ in range(20000):
+        fragments = [''.join(rnd.choice(alphabet) for _ in range(rnd.randint(0, 6)))
+                     for _ in range(rnd.randint(0, 6))]
+        assert joined(fragments) == clean_result(''.join(fragments)), fragments
+
+    manager = BibliographyManager()
+    separators = ['. ', ', ', ',', '.', ' ', '', ' ; ', ': ', '" ']
+    for reference in CorpusGenerator(seed=1).references(2000):
+        item = manager._parse_reference(reference)
+        if not item:
+            continue
+        fragments = []
+        for value in item.get_all_fields().values():
+            fragments.append(str(value))
+            fragments.append(rnd.choice(separators))
+        assert joined(fragments) == clean_result(''.join(fragments)), fragments
+
+def test_formatted_output_cache(monkeypatch):
+    """Тест кэша форматирования: повторный вывод без пересчета, правки сбрасывают кэш"""
+    from bibliography_manager import BibliographyManager
+    from citation_style import CitationStyle, StylePlan
+    from bibliography import Article
+    from author import Author
+
+    manager = BibliographyManager()
+    manager.current_style = CitationStyle("Тест")
+    manager.current_style.set_field_order(['authors_str', 'title', 'year'])
+    article = Article(authors=[Author("Иванов", "И", "И")], title="Статья", year=2020)
+    manager.add_item(article)
+    first = manager.format_all_items()
+
+    calls = []
+    original = StylePlan.format_item
+    monkeypatch.setattr(StylePlan, 'format_item',
+                        lambda self, item, *args: calls.append(item) or original(self, item, *args))
+    assert manager.format_all_items() == first
+    assert calls == []
+
+    article.title = "Новая статья"
+    assert "Новая статья" in manager.format_all_items()[0]
+
+    article.authors.append(Author("Петров", "П"))
+    article.touch()
+    assert "Петров" in manager.format_all_items()[0]
+
+    manager.current_style.set_field_separator('title', ', ')
+    assert "Новая статья," in manager.format_all_items()[0]
+    assert len(calls) == 3
+
+def test_benchmark_cold_repeats_bypass_format_cache(monkeypatch, tmp_path):
+    """Тест бенчмарка: каждый холодный повтор форматирует записи заново, теплые замеры отдельно"""
+    from benchmarks import run
+    from citation_style import StylePlan
+
+    calls = []
+    original = StylePlan.format_item
+    monkeypatch.setattr(StylePlan, 'format_item', lambda self, item, *args: calls.append(item) or original(self, item, *args))
+    results = run.run_size(40, tmp_path, repeat=2)
+
+    assert len(calls) >= 2 * len(set(map(id, calls)))
+    assert {'format_all_items_warm', 'save_to_docx_warm'} <= set(results)
+
+def test_style_diff_invalidates_affected_items(monkeypatch):
+    """Тест сравнения стилей: после правки поля журнала пересчитываются только статьи"""
+    from bibliography_manager import BibliographyManager
+    from citation_style import CitationStyle, StylePlan
+    from bibliography import Article, Book, ResourceType
+    from author import Author
+
+    style = CitationStyle("Тест")
+    style.set_field_order(['authors_str', 'title', 'journal', 'publisher', 'year'])
+    changed = style.copy()
+    changed.set_field_separator('journal', ', ')
+    assert style.diff(changed) == ({'journal'}, {ResourceType.ARTICLE})
+    assert style.diff(style.copy()) == (set(), set())
+
+    manager = BibliographyManager()
+    manager.current_style = style
+    article = Article(authors=[Author("Иванов", "И", "И")], title="Статья", year=2020, journal="Журнал")
+    book = Book(authors=[Author("Петров", "П")], title="Книга", year=2019, publisher="Наука")
+    manager.items = [article, book]
+    manager.format_all_items()
+
+    calls = []
+    original = StylePlan.format_item
+    monkeypatch.setattr(StylePlan, 'format_item',
+                        lambda self, item, *args: calls.append(item) or original(self, item, *args))
+    style.set_field_separator('journal', ', ')
+    formatted = manager.format_all_items()
+    assert calls == [article]
+    assert formatted == [original(style.compile(), article), original(style.compile(), book)]
+
+    # Сегменты - значения полей записи: смена оформления их не сбрасывает, кроме строки авторов
+    segments = manager._format_cache[article][3]
+    assert segments['journal'] == "Журнал"
+    style.author_format_config.initials_dot = False
+    assert manager.format_all_items()[0].startswith("Иванов ИИ")
+    assert manager._format_cache[article][3] is segments and segments['journal'] == "Журнал"
+
+def test_author_formatter_recompiles_on_config_change():
+    """Тест компилированного форматтера авторов: изменение конфигурации пересобирает функцию"""
+    from author_formatter import AuthorFormatter
+    from author import Author, AuthorFormat, AuthorFormatConfig
+
+    config = AuthorFormatConfig.get_preset(AuthorFormat.LAST_FIRST_INITIALS)
+    formatter = AuthorFormatter(config)
+    authors = [Author("Иванов", "Жан-Поль", "И"), Author("Petrov", "P")]
+    assert formatter.format_authors(authors) == "Иванов Ж.-П.И. и Petrov P."
+
+    config.initials_dot = False
+    assert formatter.format_author(authors[0]) == "Иванов Ж-ПИ"
+
+    config.format_type = AuthorFormat.LAST_FIRST_FULL
+    config.parts_order = ["last_name", "first_initial"]
+    assert formatter.format_author(authors[0]) == "Иванов Ж-П"
+    config.parts_order.append("middle_name")
+    assert formatter.format_author(authors[0]) == "Иванов Ж-П И"
+
+def test_custom_author_template():
+    """Тест пользовательского шаблона: пустые значения оставляют плейсхолдер"""
+    from author_formatter import AuthorFormatter
+    from author import Author, AuthorFormat, AuthorFormatConfig
+
+    config = AuthorFormatConfig.get_preset(AuthorFormat.CUSTOM)
+    config.template = " {l}, {f}.{m}. {x} "
+    formatter = AuthorFormatter(config)
+    assert formatter.format_author(Author("Иванов", "жан-поль", "И")) == "Иванов, Ж-П.И. {x}"
+    assert formatter.format_author(Author("Петров", "П")) == "Петров, П.{m}. {x}"
+
+    config.template = "{initials} {last}"
+    assert formatter.format_author(Author("Иванов", "Иван", "Иванович")) == "И.И. Иванов"
+
+def test_compact_author_list():
+    """Тест компактного списка авторов: хвост разбирается только при обращении"""
+    import pickle
+    from bibliography_manager import BibliographyManager
+    from citation_style import CitationStyle
+    from author import AuthorList
+
+    names = "; ".join(f"Author{i}, A." for i in range(40))
+    manager = BibliographyManager()
+    item = manager._parse_reference(f'{names} "Collaboration paper," Nature, vol. 1, pp. 3-4, 2020.')
+    assert isinstance(item.authors, AuthorList)
+
+    style = CitationStyle("Тест")
+    style.set_field_order(['authors_str', 'title'])
+    assert style.format_item(item).startswith("Author0 A., Author1 A. и Author2 A. и др.")
+    assert item.authors._tail
+
+    restored = pickle.loads(pickle.dumps(item))
+    assert len(item.authors) == 40 and not item.authors._tail
+    assert item.authors[-1].last_name == "Author39"
+    assert restored.authors == item.authors
+
+def test_fused_format_and_validate(monkeypatch):
+    """Тест совмещенного прохода форматирования и проверки обязательных полей"""
+    from bibliography_manager import BibliographyManager
+    from citation_style import CitationStyle
+    from bibliography import Article, Book, BibliographicItem
+    from author import Author
+
+    style = CitationStyle("Тест")
+    style.set_field_order(['authors_str', 'title', 'journal', 'year'])
+    style.set_required_fields(['authors_str', 'publisher', 'journal', 'year'])
+    manager = BibliographyManager()
+    manager.current_style = style
+    manager.items = [
+        Article(authors=[Author("Иванов", "И")], title="Статья", year=2020, journal="Журнал", publisher="Наука"),
+        Book(title="Книга", year=2019),
+    ]
+    expected = [(style.format_item(item), item.get_missing_fields(style.required_fields)) for item in manager.items]
+    assert expected[1][1] == ['authors_str', 'publisher', 'journal']
+
+    monkeypatch.setattr(BibliographicItem, 'get_missing_fields', lambda self, fields: 1 / 0)
+    assert manager.format_and_validate_all_items() == expected
+    assert [result[1:] for result in manager.validate_all_items()] == [(True, []), (False, expected[1][1])]
+
+def test_streaming_docx_export(tmp_path):
+    """Тест потоковой записи DOCX: нумерация, текст и предупреждение о недостающих полях"""
+    from docx import Document
+    from docx.shared import RGBColor
+    from bibliography_manager import BibliographyManager
+    from citation_style import CitationStyle
+    from bibliography import Article
+    from author import Author
+
+    style = CitationStyle("Тест")
+    style.set_field_order(['authors_str', 'title', 'year'])
+    style.set_required_fields(['publisher'])
+    manager = BibliographyManager()
+    manager.current_style = style
+    manager.items = [Article(authors=[Author("Иванов", "И")], title="A & B <c>", year=2020)]
+    path = tmp_path / "out.docx"
+    manager.save_to_docx(str(path))
+
+    paragraphs = Document(str(path)).paragraphs
+    assert paragraphs[0].text == "Список литературы"
+    number, text, warning = paragraphs[1].runs
+    assert number.bold and number.text == "1. "
+    assert text.text == manager.format_all_items()[0]
+    assert warning.italic and warning.font.color.rgb == RGBColor(255, 0, 0)
+    assert warning.text == " [Отсутствуют: publisher]"
+
+def test_docx_export_keeps_previous_file_on_failure(tmp_path):
+    """Тест записи DOCX: ошибка при формировании абзацев не портит существующий файл"""
+    from docx_writer import render_entry, write_docx
+
+    path = tmp_path / "out.docx"
+    write_docx(path, "Список литературы", [render_entry(1, "Первая запись")])
+    original = path.read_bytes()
+
+    def broken():
+        yield render_entry(1, "Новая запись")
+        raise ValueError("сбой")
+
+    with pytest.raises(ValueError):
+        write_docx(path, "Список литературы", broken())
+    assert path.read_bytes() == original
+    assert [p.name for p in tmp_path.iterdir()] == ["out.docx"]
+
+def test_parallel_docx_export_matches_serial(monkeypatch, tmp_path):
+    """Тест параллельного экспорта: XML абзацев из процессов совпадает с последовательной записью"""
+    import zipfile
+    import bibliography_manager
+    from bibliography_manager import BibliographyManager
+    from citation_style import CitationStyle
+
+    monkeypatch.setattr(bibliography_manager, 'PARALLEL_MIN_LINES', 4)
+    monkeypatch.setattr(bibliography_manager, 'PARALLEL_BATCH_SIZE', 3)
+
+    style = CitationStyle("Тест")
+    style.set_field_order(['authors_str', 'title', 'journal', 'volume', 'year'])
+    style.set_required_fields(['publisher'])
+    manager = BibliographyManager()
+    manager.current_style = style
+    manager.items = manager._parse_lines([f'Author{i}, A. Title number {i}. Journal, vol. {i}, 20{10 + i % 10}.'
+                                          for i in range(10)])
+    manager.save_to_docx(str(tmp_path / "serial.docx"))
+    manager.save_to_docx(str(tmp_path / "parallel.docx"), workers=2)
+
+    with zipfile.ZipFile(tmp_path / "serial.docx") as serial, zipfile.ZipFile(tmp_path / "parallel.docx") as parallel:
+        assert serial.namelist() == parallel.namelist()
+        for name in serial.namelist():
+            assert serial.read(name) == parallel.read(name)
+
+def test_parallel_docx_export_reuses_cache_and_survives_worker_failure(monkeypatch, tmp_path):
+    """Тест параллельного экспорта: кэш форматирования без пула процессов и сохранность файла при сбое"""
+    import concurrent.futures
+    import zipfile
+    import bibliography_manager
+    from bibliography_manager import BibliographyManager
+    from citation_style import CitationStyle
+
+    monkeypatch.setattr(bibliography_manager, 'PARALLEL_MIN_LINES', 4)
+    monkeypatch.setattr(bibliography_manager, 'PARALLEL_BATCH_SIZE', 3)
+
+    style = CitationStyle("Тест")
+    style.set_field_order(['authors_str', 'title', 'year'])
+    style.set_required_fields(['publisher'])
+    manager = BibliographyManager()
+    manager.current_style = style
+    manager.items = manager._parse_lines([f'Author{i}, A. Title number {i}. Journal, 20{10 + i}.' for i in range(10)])
+    path = tmp_path / "out.docx"
+    manager.save_to_docx(str(path))
+    original = path.read_bytes()
+
+    manager.items[3].note = lambda: None
+    manager._format_cache.clear()
+    with pytest.raises(Exception):
+        manager.save_to_docx(str(path), workers=2)
+    assert path.read_bytes() == original
+    assert [p.name for p in tmp_path.iterdir()] == ["out.docx"]
+
+    del manager.items[3].note
+    manager.format_and_validate_all_items()
+
+    class NoPool:
+        def __init__(self, *args, **kwargs):
+            raise AssertionError("все записи есть в кэше")
+    monkeypatch.setattr(concurrent.futures, 'ProcessPoolExecutor', NoPool)
+    manager.save_to_docx(str(tmp_path / "cached.docx"), workers=2)
+    # Готовый XML абзацев тоже берется из кэша
+    with pytest.MonkeyPatch.context() as mp:
+        mp.setattr(bibliography_manager, 'render_entry_body', NoPool)
+        manager.save_to_docx(str(tmp_path / "rendered.docx"), workers=2)
+    assert (tmp_path / "rendered.docx").read_bytes() == (tmp_path / "cached.docx").read_bytes()
+    manager._format_cache.clear()
+    monkeypatch.setattr(bibliography_manager, 'PARALLEL_MIN_LINES', 1000)
+    manager.save_to_docx(str(tmp_path / "serial.docx"))
+    with zipfile.ZipFile(tmp_path / "cached.docx") as cached, zipfile.ZipFile(tmp_path / "serial.docx") as serial:
+        assert cached.read('word/document.xml') == serial.read('word/document.xml')
+
+def test_cli_subcommands(tmp_path, capsys):
+    """Тест консольных подкоманд format и validate на текстовом файле"""
+    import json
+    import cli
+    from citation_style import CitationStyle
+
+    style = CitationStyle("Тест")
+    style.set_field_order(['authors_str', 'title', 'journal', 'year'])
+    style.set_required_fields(['publisher'])
+    style_path = tmp_path / "style.json"
+    style_path.write_text(json.dumps(style.to_dict(), ensure_ascii=False), encoding='utf-8')
+    input_path = tmp_path / "refs.txt"
+    input_path.write_text("Smith, J. A study of parsers. Journal of Physics, vol. 2, 2020.\n\n", encoding='utf-8')
+
+    assert cli.main(['format', str(input_path), '--style', str(style_path), '--numbered']) == 0
+    output = capsys.readouterr().out.splitlines()
+    assert len(output) == 1 and output[0].startswith("1. Smith J.")
+
+    assert cli.main(['validate', str(input_path), '--style', str(style_path)]) == 1
+    assert "publisher" in capsys.readouterr().out
+
+def test_cli_cold_start_budget(tmp_path):
+    """Тест холодного запуска: подкоманда parse в новом интерпретаторе без python-docx и tkinter"""
+    import subprocess
+    import sys
+    import time
+    from pathlib import Path
+
+    source = tmp_path / "refs.txt"
+    source.write_text("Smith, J. A study of parsers. Journal of Physics, vol. 2, 2020.\n", encoding='utf-8')
+    root = str(Path(__file__).resolve().parent.parent)
+
+    def best_time(args):
+        # Лучшее из трех запусков, чтобы не зависеть от случайной нагрузки
+        times = []
+        for _ in range(3):
+            start = time.perf_counter()
+            result = subprocess.run([sys.executable] + args, cwd=root,
+                                    capture_output=True, text=True, check=True)
+            times.append(time.perf_counter() - start)
+        return min(times), result
+
+    bare, _ = best_time(['-c', 'pass'])
+    elapsed, result = best_time(['-X', 'importtime', '-m', 'cli', 'parse', str(source)])
+    assert '"title"' in result.stdout
+    modules = set()
+    for line in result.stderr.splitlines():
+        if line.startswith('import time:') and '|' in line:
+            modules.add(line.split('|')[-1].strip())
+    assert 'bibliography_manager' in modules
+    assert 'docx' not in modules and 'tkinter' not in modules
+    # Сверх запуска пустого интерпретатора: импорт, разбор и вывод
+    assert elapsed - bare < 0.3
+
+def test_setup_lists_all_top_level_modules():
+    """Тест setup.py: все модули из корня проекта устанавливаются вместе с консольными командами"""
+    import ast
+    from pathlib import Path
+
+    root = Path(__file__).resolve().parent.parent
+    tree = ast.parse((root / "setup.py").read_text(encoding='utf-8'))
+    call = next(node for node in ast.walk(tree) if isinstance(node, ast.Call)
+                and getattr(node.func, 'id', None) == 'setup')
+    py_modules = next(ast.literal_eval(kw.value) for kw in call.keywords if kw.arg == 'py_modules')
+    assert sorted(py_modules) == sorted(p.stem for p in root.glob('*.py') if p.stem != 'setup')
+
+def test_cli_filter_streams_lines(tmp_path, capsys):
+    """Тест режима фильтра: строка на входе - строка на выходе, закрытый канал не дает ошибки"""
+    import json
+    import subprocess
+    import sys
+    from pathlib import Path
+    import cli
+    from citation_style import CitationStyle
+
+    style = CitationStyle("Тест")
+    style.set_field_order(['authors_str', 'title', 'year'])
+    style.set_required_fields(['publisher'])
+    style_path = tmp_path / "style.json"
+    style_path.write_text(json.dumps(style.to_dict(), ensure_ascii=False), encoding='utf-8')
+    input_path = tmp_path / "refs.txt"
+    input_path.write_text("Smith, J. A study of parsers. Journal of Physics, vol. 2, 2020.\n\n", encoding='utf-8')
+
+    assert cli.main(['filter', '--style', str(style_path), '--input', str(input_path),
+                     '--output-format', 'tsv']) == 0
+    first, second = capsys.readouterr().out.splitlines()
+    assert first.startswith("Smith J.") and first.endswith("\tpublisher")
+    assert second == "\t"
+
+    process = subprocess.Popen([sys.executable, 'cli.py', 'filter', '--style', str(style_path)],
+                               cwd=str(Path(__file__).resolve().parent.parent),
+                               stdin=subprocess.PIPE, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+    process.stdin.write(b"Smith, J. A study of parsers. 2020.\n")
+    process.stdin.flush()
+    assert process.stdout.readline().startswith(b"Smith J.")
+    process.stdout.close()
+    try:
+        for _ in range(1000):
+            process.stdin.write(b"Smith, J. A study of parsers. 2020.\n" * 100)
+        process.stdin.close()
+    except BrokenPipeError:
+        pass
+    assert process.wait(timeout=60) == 141
+    assert b"Traceback" not in process.stderr.read()
+
+def test_cli_windows_closed_pipe(monkeypatch, capsys):
+    """Тест закрытого канала в Windows: OSError с EINVAL завершает работу как SIGPIPE"""
+    import errno
+    import cli
+
+    def closed_pipe(args):
+        raise OSError(errno.EINVAL, "Invalid argument")
+
+    def bad_path(args):
+        raise OSError(errno.EINVAL, "Invalid argument", "refs?.txt")
+
+    monkeypatch.setattr(cli, '_silence_stdout', lambda: None)
+    monkeypatch.setattr(cli.sys, 'platform', 'win32')
+    monkeypatch.setattr(cli, 'cmd_filter', closed_pipe)
+    assert cli.main(['filter', '--style', 'style.json']) == 141
+    monkeypatch.setattr(cli, 'cmd_filter', bad_path)
+    assert cli.main(['filter', '--style', 'style.json']) == 1
+    assert "refs?.txt" in capsys.readouterr().err
+    monkeypatch.setattr(cli.sys, 'platform', 'linux')
+    monkeypatch.setattr(cli, 'cmd_filter', closed_pipe)
+    assert cli.main(['filter', '--style', 'style.json']) == 1
+
+def test_batch_processing_survives_bad_file(tmp_path):
+    """Тест пакетной обработки: зеркальное дерево, отчет и пропуск испорченного файла"""
+    import json
+    from pathlib import Path
+    import cli
+    from citation_style import CitationStyle
+    from benchmarks.corpus import CorpusGenerator, write_docx_corpus
+
+    style = CitationStyle("Тест")
+    style.set_field_order(['authors_str', 'title', 'year'])
+    style_path = tmp_path / "style.json"
+    style_path.write_text(json.dumps(style.to_dict(), ensure_ascii=False), encoding='utf-8')
+
+    inputs = tmp_path / "in"
+    (inputs / "nested").mkdir(parents=True)
+    write_docx_corpus(inputs / "first.docx", CorpusGenerator(1).references(20))
+    write_docx_corpus(inputs / "nested" / "second.docx", CorpusGenerator(2).references(30))
+    (inputs / "broken.docx").write_bytes(b"not a zip")
+
+    report_path = tmp_path / "report.json"
+    assert cli.main(['batch', str(inputs), '--style', str(style_path), '--workers', '2',
+                     '--output-dir', str(tmp_path / "out"), '--report', str(report_path)]) == 1
+
+    summary = json.loads(report_path.read_text(encoding='utf-8'))
+    by_name = {Path(r['input']).name: r for r in summary['files']}
+    assert by_name['broken.docx']['error'].startswith("BadZipFile")
+    assert by_name['first.docx']['error'] is None and by_name['first.docx']['items'] >= 20
+    assert (tmp_path / "out" / "first.docx").exists()
+    assert (tmp_path / "out" / "nested" / "second.docx").exists()
+    assert not list((tmp_path / "out").rglob("*.tmp"))
+    assert summary['failed_files'] == 1
+
+    # Каталог результатов внутри входного не попадает во входные файлы следующего запуска
+    nested_output = inputs / "out"
+    for _ in range(2):
+        cli.main(['batch', str(inputs), '--style', str(style_path), '--output-dir', str(nested_output)])
+    assert (nested_output / "first.docx").exists()
+    assert not (nested_output / "out").exists()
+
+def test_batch_manifest_skips_unchanged_inputs(monkeypatch, tmp_path):
+    """Тест манифеста: неизмененные файлы пропускаются, изменения входа и стиля учитываются"""
+    import batch
+    from citation_style import CitationStyle
+    from benchmarks.corpus import CorpusGenerator, write_docx_corpus
+
+    style = CitationStyle("Тест")
+    style.set_field_order(['authors_str', 'title', 'year'])
+    first = tmp_path / "first.docx"
+    second = tmp_path / "second.docx"
+    write_docx_corpus(first, CorpusGenerator(1).references(10))
+    write_docx_corpus(second, CorpusGenerator(2).references(10))
+    base, inputs = batch.collect_inputs(str(tmp_path))
+    jobs = [(path, batch.output_path_for(path, base)) for path in inputs]
+    manifest_path = batch.default_manifest_path(base)
+
+    def run(style_data):
+        results = batch.run_incremental(jobs, style_data, batch.BatchManifest(manifest_path))
+        return [r['skipped'] for r in results]
+
+    assert run(style.to_dict()) == [False, False]
+    assert run(style.to_dict()) == [True, True]
+
+    write_docx_corpus(second, CorpusGenerator(3).references(10))
+    assert run(style.to_dict()) == [True, False]
+
+    jobs[0][1].unlink()
+    assert run(style.to_dict()) == [False, True]
+
+    style.set_field_order(['title', 'authors_str'])
+    assert run(style.to_dict()) == [False, False]
+
+    # Новая версия вывода делает недействительными все записи манифеста
+    import citation_style
+    monkeypatch.setattr(citation_style, 'OUTPUT_VERSION', 'следующая')
+    assert run(style.to_dict()) == [False, False]
+
+    # Вход и манифест на разных дисках Windows: в манифест попадает абсолютный путь
+    manifest = batch.BatchManifest(manifest_path)
+    def other_drive(path, start=None):
+        raise ValueError("path is on mount 'D:', start on mount 'C:'")
+    monkeypatch.setattr(batch.os.path, 'relpath', other_drive)
+    assert manifest._name(first) == first.resolve().as_posix()
+
+def test_pipeline_matches_serial_export_with_bounded_queues(tmp_path):
+    """Тест конвейера: тот же DOCX, что и при последовательной обработке, и ограниченная очередь"""
+    import time
+    import zipfile
+    import pipeline
+    from bibliography_manager import BibliographyManager
+    from citation_style import CitationStyle
+    from benchmarks.corpus import CorpusGenerator, write_text_corpus
+
+    style = CitationStyle("Тест")
+    style.set_field_order(['authors_str', 'title', 'journal', 'year'])
+    style.set_required_fields(['authors_str', 'title', 'year'])
+    source = tmp_path / "refs.txt"
+    write_text_corpus(source, CorpusGenerator(5).references(120))
+
+    manager = BibliographyManager()
+    manager.current_style = style
+    manager.items = manager._parse_lines(manager.read_reference_lines(source),
+                                         field_mask=manager.style_field_mask())
+    manager.save_to_docx(str(tmp_path / "serial.docx"))
+    stats = pipeline.convert_file(source, tmp_path / "pipe.docx", style, batch_size=16, queue_depth=2)
+
+    def body(path):
+        with zipfile.ZipFile(path) as archive:
+            return archive.read('word/document.xml')
+
+    assert stats['items'] == len(manager.items)
+    assert body(tmp_path / "serial.docx") == body(tmp_path / "pipe.docx")
+
+    produced = []
+    def source_batches():
+        for i in range(50):
+            produced.append(i)
+            yield [i]
+
+    stages = [pipeline.Stage(lambda batch: batch), pipeline.Stage(lambda batch: [x * 2 for x in batch])]
+    seen = []
+    for batch in pipeline.run_pipeline(source_batches(), stages, queue_depth=2):
+        time.sleep(0.002)
+        seen.extend(batch)
+        # Источник не уходит вперед больше, чем вмещают очереди и стадии
+        assert len(produced) - len(seen) <= 3 * 2 + 3
+    assert seen == [i * 2 for i in range(50)]
+
+    def failing(batch):
+        raise ValueError("сбой стадии")
+    with pytest.raises(ValueError, match="сбой стадии"):
+        list(pipeline.run_pipeline(source_batches(), [pipeline.Stage(failing)]))
+
+def test_pipeline_process_stages(tmp_path):
+    """Тест конвейера в процессах: совпадение с последовательной записью, ошибки и сохранность результата"""
+    import json
+    import zipfile
+    import cli
+    import pipeline
+    from citation_style import CitationStyle
+    from benchmarks.corpus import CorpusGenerator, write_text_corpus
+
+    style = CitationStyle("Тест")
+    style.set_field_order(['authors_str', 'title', 'journal', 'year'])
+    style.set_required_fields(['authors_str', 'title', 'year'])
+    source = tmp_path / "refs.txt"
+    write_text_corpus(source, CorpusGenerator(7).references(80))
+
+    pipeline.convert_file(source, tmp_path / "serial.docx", style, batch_size=16)
+    stats = pipeline.convert_file(source, tmp_path / "parallel.docx", style, workers=2, batch_size=16)
+    with zipfile.ZipFile(tmp_path / "serial.docx") as serial, zipfile.ZipFile(tmp_path / "parallel.docx") as parallel:
+        assert serial.read('word/document.xml') == parallel.read('word/document.xml')
+    assert stats['items'] > 0
+
+    with pytest.raises(ValueError):
+        list(pipeline.run_pipeline(["1", "не число", "3"], [pipeline.Stage(int, 2)]))
+
+    style_path = tmp_path / "style.json"
+    style_path.write_text(json.dumps(style.to_dict(), ensure_ascii=False), encoding='utf-8')
+    broken = tmp_path / "broken.txt"
+    broken.write_bytes(source.read_bytes() + b"\xff\xfe invalid\n")
+    output = tmp_path / "parallel.docx"
+    previous = output.read_bytes()
+    assert cli.main(['convert', str(broken), str(output), '--style', str(style_path), '--workers', '2']) == 1
+    assert output.read_bytes() == previous
+
+
 if __name__ == "__main__":
     pytest.main([__file__, "-v"])
\ No newline at end of file
@@ -0,0 +1,13 @@
+# Единственное место, где задаются версии; setup.py читает __version__ из этого файла
+__version__ = "1.0.0"
+
+# Увеличивать при любом изменении разбора, после которого записи из кэша
+# разобранных ссылок (reference_cache) становятся неверными
+PARSER_VERSION = "1"
+
+# Увеличивать при любом изменении форматирования или записи DOCX, меняющем вывод.
+# От нее зависят отпечаток стиля и ключи манифеста пакетной обработки: без этого
+# результаты прошлых запусков будут считаться актуальными
+OUTPUT_VERSION = "1"
+
+TOOL_VERSION = f"{__version__}+parser.{PARSER_VERSION}.output.{OUTPUT_VERSION}"